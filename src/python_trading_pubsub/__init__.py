@@ -2,7 +2,7 @@
 
 __version__ = "0.1.0"
 
-from src.python_trading_pubsub.core.pubsub_client import PubSubClient
-from src.python_trading_pubsub.core.pubsub_message import PubSubMessage
+from .core.pubsub_client import PubSubClient
+from .core.pubsub_message import LazyMessage, PubSubMessage
 
-__all__ = ["PubSubClient", "PubSubMessage"]
+__all__ = ["LazyMessage", "PubSubClient", "PubSubMessage"]
@@ -1,22 +1,252 @@
 """Database manager for trading positions."""
 
-import json
+import collections
+import os
+import queue
 import sqlite3
 import threading
-from datetime import datetime
-from typing import Any, Dict, List, Optional
-from uuid import uuid4  # Import uuid4 for generating unique message IDs
+import time
+from contextlib import closing, contextmanager
+from functools import lru_cache
+from typing import Any, Callable, Deque, Dict, Iterator, List, Optional, Tuple, Union
+from uuid import UUID, uuid4  # Import uuid4 for generating unique message IDs
 
-from src.python_trading_pubsub.business.enums.operation import Operation
-from src.python_trading_pubsub.business.tools.logger import runtime
-from src.python_trading_pubsub.core.events import EventType
-from src.python_trading_pubsub.core.pubsub_client import PubSubClient
+import orjson
+
+from ..core.events import EventType
+from ..core.pubsub_client import PubSubClient
+from .enums.operation import Operation
+from .tools.logger import runtime
 
 # NO MORE DIRECT IMPORTS of Position, Pool, Price, Token for internal logic
 
 
 # from core.pubsub_message import PubSubMessage # Not needed to import here
 
+# Per-connection tuning applied to every new SQLite connection
+_CONNECTION_PRAGMAS = (
+    "PRAGMA synchronous=NORMAL;",
+    "PRAGMA busy_timeout=5000;",
+    "PRAGMA temp_store=MEMORY;",
+    "PRAGMA cache_size=-64000;",
+)
+
+# ISO-8601 text -> unix milliseconds, evaluated by SQLite (NULL if the text is not a date)
+_ISO_TO_MS_SQL = "CAST(ROUND((julianday({}) - 2440587.5) * 86400000) AS INTEGER)"
+
+
+# An add-position request queued for the drainer: positions row, BUY event row, and the original payload
+_AddItem = Tuple[tuple, tuple, Dict[str, Any]]
+
+# Event-type strings stored in position_events, resolved once rather than through the enum per request
+_OP_BUY = Operation.BUY.value
+_OP_SELL = Operation.SELL.value
+
+
+def _now_ms() -> int:
+    return time.time_ns() // 1_000_000
+
+
+# --- SQL statements ---
+# Kept as module constants so every call reuses the exact same text and hits SQLite's statement cache.
+# The *_IN templates take a "{placeholders}" list sized by _bucket_pools().
+
+_SQL_INSERT_POSITION = """
+    INSERT INTO positions (id, purchase_price, number_of_tokens, expected_sale_price,
+                           next_purchase_price, variations, timestamp, status, pair, pool_name, timestamp_ms)
+    VALUES (?1, ?2, ?3, ?4, ?5, ?6, ?7, ?8, ?9, ?10, COALESCE({}, ?11))
+""".format(_ISO_TO_MS_SQL.format("?7"))
+_SQL_INSERT_POSITION_EVENT = """
+    INSERT INTO position_events (position_id, event_type, timestamp)
+    VALUES (?, ?, ?)
+"""
+_SQL_CLOSE_POSITION = "UPDATE positions SET status = 'closed' WHERE id = ?"
+_SQL_CANCEL_EVENTS = """
+    INSERT INTO position_events (position_id, event_type, timestamp)
+    SELECT position_id, ? AS event_type, ? AS timestamp
+    FROM position_events
+    WHERE event_type = ?
+"""
+_SQL_CLOSE_OPEN_POSITIONS = "UPDATE positions SET status = 'closed' WHERE status = 'open'"
+_SQL_UPDATE_SELL_PRICE = "UPDATE positions SET expected_sale_price = ? WHERE id = ?"
+_SQL_APPLY_SELL_PERCENTAGE = (
+    "UPDATE positions SET expected_sale_price = purchase_price * (1 + ? / 100.0) WHERE id = ?"
+)
+# RETURNING reports the value before column affinity, so an integral REAL would come back as an int
+_SQL_APPLY_SELL_PERCENTAGE_RETURNING = _SQL_APPLY_SELL_PERCENTAGE + " RETURNING CAST(expected_sale_price AS REAL)"
+_SQL_SALE_PRICE_BY_ID = "SELECT expected_sale_price FROM positions WHERE id = ?"
+# UPDATE ... RETURNING needs SQLite 3.35+; older libraries re-read the row in the same transaction
+_RETURNING_SUPPORTED = sqlite3.sqlite_version_info >= (3, 35, 0)
+
+_SQL_LAST_PURCHASE_PRICE = """
+    SELECT purchase_price
+    FROM positions
+    WHERE status = 'open'
+    ORDER BY timestamp_ms DESC
+    LIMIT 1
+"""
+_SQL_LAST_PURCHASE_PRICE_IN = """
+    SELECT purchase_price
+    FROM positions
+    WHERE status = 'open' AND pool_name IN ({placeholders})
+    ORDER BY timestamp_ms DESC
+    LIMIT 1
+"""
+# The positions listings are rendered to JSON by SQLite itself, from these fixed column lists. REAL columns
+# go through printf('%!.17g') so the JSON numbers round-trip to the exact stored doubles.
+_OPENED_POSITIONS_COLUMNS = (
+    "id",
+    "purchase_price",
+    "number_of_tokens",
+    "expected_sale_price",
+    "next_purchase_price",
+    "variations",
+    "timestamp",
+    "pair",
+    "pool_name",
+    "status",
+)
+_ALL_POSITIONS_COLUMNS = (
+    "id",
+    "number_of_tokens",
+    "expected_sale_price",
+    "next_purchase_price",
+    "purchase_price",
+    "timestamp",
+    "status",
+    "pool_name",
+    "variations",
+)
+_REAL_COLUMNS = frozenset({"purchase_price", "number_of_tokens", "expected_sale_price", "next_purchase_price"})
+
+
+def _json_column(column: str) -> str:
+    return f"json(printf('%!.17g', {column}))" if column in _REAL_COLUMNS else column
+
+
+# Opened positions are column-oriented: one array per column, all in timestamp order
+_OPENED_POSITIONS_JSON = "json_object({})".format(
+    ", ".join(f"'{column}', json_group_array({_json_column(column)})" for column in _OPENED_POSITIONS_COLUMNS)
+)
+_SQL_OPENED_POSITIONS = f"""
+    SELECT {_OPENED_POSITIONS_JSON}
+    FROM (SELECT * FROM positions WHERE status = 'open' ORDER BY timestamp_ms ASC)
+"""
+_SQL_OPENED_POSITIONS_IN = f"""
+    SELECT {_OPENED_POSITIONS_JSON}
+    FROM (SELECT * FROM positions WHERE status = 'open' AND pool_name IN ({{placeholders}}) ORDER BY timestamp_ms ASC)
+"""
+_SQL_COUNT_OPENED_POSITIONS = "SELECT COUNT(*) FROM positions WHERE status = 'open'"
+_SQL_COUNT_OPENED_POSITIONS_IN = (
+    "SELECT COUNT(*) FROM positions WHERE status = 'open' AND pool_name IN ({placeholders})"
+)
+_SQL_MAX_SALE_PRICE = "SELECT MAX(expected_sale_price) FROM positions WHERE status = 'open'"
+_SQL_MAX_SALE_PRICE_IN = (
+    "SELECT MAX(expected_sale_price) FROM positions WHERE status = 'open' AND pool_name IN ({placeholders})"
+)
+_SQL_ALL_POSITIONS = """
+    SELECT json_group_array(json_object({}))
+    FROM (SELECT * FROM positions ORDER BY timestamp_ms ASC)
+""".format(
+    ", ".join(f"'{column}', {_json_column(column)}" for column in _ALL_POSITIONS_COLUMNS)
+)
+
+# pools_names lists are padded up to one of these sizes, so an IN (...) query has at most a few SQL texts
+_POOL_BUCKETS = (1, 4, 16, 64)
+_POOL_PADDING = ""  # never a real pool_name
+
+
+def _bucket_pools(pools_names: List[str]) -> List[str]:
+    size = len(pools_names)
+    for bucket in _POOL_BUCKETS:
+        if size <= bucket:
+            return list(pools_names) + [_POOL_PADDING] * (bucket - size)
+    return list(pools_names)
+
+
+@lru_cache(maxsize=64)
+def _in_sql(template: str, size: int) -> str:
+    """Formats an *_IN template for size placeholders; cached, so each (template, bucket) is built once."""
+    # nosec B608 - only "?" placeholders are interpolated
+    return template.format(placeholders=", ".join("?" * size))
+
+
+def _in_query(template: str, pools_names: List[str]) -> Tuple[str, List[str]]:
+    """Returns the IN (...) query text for the padded pools_names, and the padded parameters."""
+    params = _bucket_pools(pools_names)
+    return _in_sql(template, len(params)), params
+
+
+class _ConnectionPool:
+    """
+    Bounded LIFO pool of SQLite connections.
+    The most recently released connection is handed out first so its page cache stays hot.
+    """
+
+    def __init__(self, factory: Callable[[], sqlite3.Connection], size: int):
+        self._factory = factory
+        self._size = size
+        self._idle: "queue.LifoQueue[sqlite3.Connection]" = queue.LifoQueue(maxsize=size)
+        self._connections: List[sqlite3.Connection] = []
+        self._lock = threading.Lock()
+        self._closed = False
+
+    @contextmanager
+    def acquire(self) -> Iterator[sqlite3.Connection]:
+        """Borrows a connection for the duration of the with-block. Raises ProgrammingError once closed."""
+        if self._closed:
+            raise sqlite3.ProgrammingError("Connection pool is closed")
+        try:
+            conn = self._idle.get_nowait()
+        except queue.Empty:
+            conn = self._create_or_wait()
+        try:
+            yield conn
+        finally:
+            if not self._closed:
+                self._idle.put(conn)
+
+    def _create_or_wait(self) -> sqlite3.Connection:
+        with self._lock:
+            if self._closed:
+                raise sqlite3.ProgrammingError("Connection pool is closed")
+            if len(self._connections) < self._size:
+                conn = self._factory()
+                self._connections.append(conn)
+                return conn
+        return self._idle.get()
+
+    def close(self) -> None:
+        """Closes every connection opened by this pool; acquire() refuses to run afterwards."""
+        with self._lock:
+            self._closed = True
+            while True:
+                try:
+                    self._idle.get_nowait()
+                except queue.Empty:
+                    break
+            for conn in self._connections:
+                conn.close()
+            self._connections.clear()
+
+
+@contextmanager
+def _immediate_transaction(conn: sqlite3.Connection) -> Iterator[sqlite3.Cursor]:
+    """
+    Runs the with-block as one BEGIN IMMEDIATE transaction on an autocommit connection.
+    The write lock is taken up front rather than upgraded mid-transaction, where it can fail with SQLITE_BUSY;
+    the block is committed if it completes and rolled back if it raises.
+    """
+    cursor = conn.cursor()
+    cursor.execute("BEGIN IMMEDIATE;")
+    try:
+        yield cursor
+        cursor.execute("COMMIT;")
+    except BaseException:
+        if conn.in_transaction:
+            cursor.execute("ROLLBACK;")
+        raise
+
 
 # noinspection PyUnusedLocal
 class DatabaseManager(threading.Thread, PubSubClient):
@@ -36,6 +266,14 @@ class DatabaseManager(threading.Thread, PubSubClient):
         EventType.CANCEL_POSITIONS_REQUEST.value,
     ]
 
+    OPTIMIZE_INTERVAL_SECONDS = 15 * 60
+    READER_POOL_SIZE = 4
+    ADD_BATCH_MAX = 64
+    ADD_BATCH_WINDOW_SECONDS = 0.01
+    MESSAGE_ID_BATCH = 512
+
+    _wal_enabled = False
+
     def __init__(self, db_path: str, pubsub_url: str, consumer_name: str = "DatabaseManager"):
         """Initialize database manager."""
         threading.Thread.__init__(self)
@@ -43,11 +281,30 @@ class DatabaseManager(threading.Thread, PubSubClient):
 
         self.db_path: str = db_path
         self.name = consumer_name
-        self._stop_event = threading.Event()
+        self._shutdown_event = threading.Event()  # set by stop(); ends the message ID refiller
+        self._optimize_timer: Optional[threading.Timer] = None
+        self._optimize_lock = threading.Lock()  # close() reads the timer while no callback can re-arm it
 
         self.__initialize_schema()
 
-        runtime.info(f"[{self.name}] Initialized for DB: {db_path}")
+        # Single writer, several query-only readers; connections live until stop()
+        self._writer_pool = _ConnectionPool(self._get_db_connection, size=1)
+        self._reader_pool = _ConnectionPool(self._get_reader_connection, size=self.READER_POOL_SIZE)
+
+        # ADD_POSITION_REQUEST bursts are coalesced into one transaction by a drainer thread. Every other
+        # handler first waits for the adds queued before it (see _wait_for_adds), so messages still take
+        # effect in the order they were received. None stops the drainer.
+        self._add_queue: "queue.Queue[Union[_AddItem, threading.Event, None]]" = queue.Queue()
+        self._add_drainer = threading.Thread(target=self._drain_add_queue, daemon=True)
+        self._add_drainer.start()
+
+        # Message IDs are generated ahead of time, in bulk, by a background thread
+        self._message_ids: Deque[str] = collections.deque()
+        self._message_ids_low = threading.Event()
+        self._message_id_refiller = threading.Thread(target=self._refill_message_ids, daemon=True)
+        self._message_id_refiller.start()
+
+        runtime.info("[%s] Initialized for DB: %s", self.name, db_path)
 
         self._register_event_handlers()
 
@@ -56,6 +313,8 @@ class DatabaseManager(threading.Thread, PubSubClient):
         conn = self._get_db_connection()
         try:
             cursor = conn.cursor()
+            cursor.execute("PRAGMA journal_mode=WAL;")
+            cursor.execute("BEGIN IMMEDIATE;")
             cursor.execute(
                 """
                 CREATE TABLE IF NOT EXISTS positions (
@@ -68,7 +327,8 @@ class DatabaseManager(threading.Thread, PubSubClient):
                     timestamp TEXT NOT NULL,
                     status TEXT NOT NULL,
                     pair TEXT NOT NULL,
-                    pool_name TEXT NOT NULL
+                    pool_name TEXT NOT NULL,
+                    timestamp_ms INTEGER
                 )
             """
             )
@@ -83,369 +343,393 @@ class DatabaseManager(threading.Thread, PubSubClient):
                 )
             """
             )
-            cursor.execute(""" CREATE INDEX IF NOT EXISTS idx_positions_timestamp ON positions (timestamp DESC); """)
-            cursor.execute(""" CREATE INDEX IF NOT EXISTS idx_positions_status ON positions (status); """)
-
             cursor.execute("PRAGMA table_info(positions);")
             columns = [col[1] for col in cursor.fetchall()]
             if "use_case" in columns:
-                runtime.info(f"[{self.name}] Migrating 'use_case' column to 'pool_name'.")
+                runtime.info("[%s] Migrating 'use_case' column to 'pool_name'.", self.name)
                 cursor.execute("ALTER TABLE positions RENAME COLUMN use_case TO pool_name;")
                 cursor.execute("DROP INDEX IF EXISTS idx_positions_use_case;")
+            if "timestamp_ms" not in columns:
+                runtime.info("[%s] Migrating 'timestamp' ordering to integer 'timestamp_ms'.", self.name)
+                cursor.execute("ALTER TABLE positions ADD COLUMN timestamp_ms INTEGER;")
+                cursor.execute(f"UPDATE positions SET timestamp_ms = {_ISO_TO_MS_SQL.format('timestamp')};")
+                # Both indexes were built on the TEXT column; they are recreated on timestamp_ms below
+                cursor.execute("DROP INDEX IF EXISTS idx_positions_timestamp;")
+                cursor.execute("DROP INDEX IF EXISTS idx_positions_status_pool_ts;")
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_positions_timestamp ON positions (timestamp_ms DESC);")
             cursor.execute("CREATE INDEX IF NOT EXISTS idx_positions_pool_name ON positions (pool_name);")
 
-            conn.commit()
-            runtime.info(f"[{self.name}] Database schema initialized/migrated.")
+            # Covers the open-positions-per-pool queries: one index seek, already sorted by timestamp_ms,
+            # without going back to the table for the prices. Supersedes the single-column status index.
+            cursor.execute(
+                """
+                CREATE INDEX IF NOT EXISTS idx_positions_status_pool_ts
+                ON positions (status, pool_name, timestamp_ms DESC, purchase_price, expected_sale_price);
+            """
+            )
+            cursor.execute("DROP INDEX IF EXISTS idx_positions_status;")
+            # Small partial index over the open subset, so closing everything skips already-closed history
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_positions_open ON positions (id) WHERE status = 'open';")
+            cursor.execute("ANALYZE positions;")
+
+            cursor.execute("COMMIT;")
+            runtime.info("[%s] Database schema initialized/migrated.", self.name)
         except sqlite3.OperationalError as e:
             runtime.warning(
-                f"[{self.name}] Schema initialization/migration skipped or failed: {e}. "
-                f"This might be expected if schema is already up-to-date."
+                "[%s] Schema initialization/migration skipped or failed: %s. "
+                "This might be expected if schema is already up-to-date.",
+                self.name,
+                e,
             )
-            conn.rollback()
+            if conn.in_transaction:
+                conn.execute("ROLLBACK;")
         finally:
             conn.close()
 
     def _get_db_connection(self) -> sqlite3.Connection:
         """
-        Provides a new thread-safe SQLite connection for each call.
+        Opens a new thread-safe SQLite connection; used as the factory of the connection pools.
+        The connection is in autocommit mode: writers open their own transactions with _immediate_transaction,
+        readers run each SELECT on its own.
+        WAL is persistent in the database file, so it is only switched on once per process;
+        the remaining PRAGMAs are per-connection and applied every time.
         """
-        return sqlite3.connect(self.db_path, check_same_thread=False)
+        conn = sqlite3.connect(self.db_path, check_same_thread=False, isolation_level=None)
+        if not DatabaseManager._wal_enabled:
+            conn.execute("PRAGMA journal_mode=WAL;")
+            DatabaseManager._wal_enabled = True
+        for pragma in _CONNECTION_PRAGMAS:
+            conn.execute(pragma)
+        return conn
+
+    def _get_reader_connection(self) -> sqlite3.Connection:
+        """
+        Opens a connection that refuses writes, for the read-only handlers. Those never open a transaction:
+        each SELECT runs in autocommit, and closing its cursor ends the implicit read snapshot at once.
+        """
+        conn = self._get_db_connection()
+        conn.execute("PRAGMA query_only=1;")
+        return conn
+
+    def _schedule_optimize(self):
+        """
+        Runs PRAGMA optimize and re-arms itself every OPTIMIZE_INTERVAL_SECONDS until close() sets _stop_event.
+        """
+        if self._stop_event.is_set():
+            return
+        try:
+            with self._writer_pool.acquire() as conn:
+                conn.execute("PRAGMA optimize;")
+        except sqlite3.Error as e:  # including the ProgrammingError of a closed pool
+            runtime.warning("[%s] PRAGMA optimize failed: %s", self.name, e)
+        with self._optimize_lock:
+            if self._stop_event.is_set():
+                return
+            self._optimize_timer = threading.Timer(self.OPTIMIZE_INTERVAL_SECONDS, self._schedule_optimize)
+            self._optimize_timer.daemon = True
+            self._optimize_timer.start()
+
+    def _refill_message_ids(self):
+        """
+        Tops up the message ID pool with MESSAGE_ID_BATCH random UUID4 strings from a single urandom read,
+        then sleeps until _next_message_id() reports the pool is running low.
+        """
+        while not self._shutdown_event.is_set():
+            random_bytes = os.urandom(16 * self.MESSAGE_ID_BATCH)
+            self._message_ids.extend(
+                str(UUID(bytes=random_bytes[i : i + 16], version=4)) for i in range(0, len(random_bytes), 16)
+            )
+            self._message_ids_low.clear()
+            self._message_ids_low.wait()
+
+    def _next_message_id(self) -> str:
+        """Returns a pre-generated UUID4 string, or a fresh one if the pool is momentarily empty."""
+        try:
+            message_id = self._message_ids.popleft()
+        except IndexError:
+            self._message_ids_low.set()
+            return str(uuid4())
+        if len(self._message_ids) < self.MESSAGE_ID_BATCH // 4:
+            self._message_ids_low.set()
+        return message_id
+
+    def _publish_event(self, event_type: EventType, payload: Any):
+        """
+        Publishes a handler result. The payload is passed as a plain value (or an orjson.Fragment holding
+        JSON already rendered by SQLite) and is serialized once, by the PubSub client, when sent.
+        """
+        self.publish(event_type.value, payload, self.consumer, message_id=self._next_message_id())
 
     def _register_event_handlers(self):
         """
-        Registers the handler methods for each subscribed topic.
+        Registers the handler methods for each subscribed topic, as one bulk update of the
+        topic -> handler dict the PubSub client dispatches from.
         """
-        self.register_handler(EventType.ADD_POSITION_REQUEST.value, self._handle_add_position_request)
-        self.register_handler(EventType.SELL_POSITION_REQUEST.value, self._handle_sell_position_request)
-        self.register_handler(EventType.REQUEST_LAST_PURCHASE_PRICE.value, self._handle_request_last_purchase_price)
-        self.register_handler(EventType.REQUEST_OPENED_POSITIONS.value, self._handle_request_opened_positions)
-        self.register_handler(
-            EventType.REQUEST_COUNT_OPENED_POSITIONS.value, self._handle_request_count_opened_positions
-        )
-        self.register_handler(EventType.REQUEST_MAX_SALE_PRICE.value, self._handle_request_max_sale_price)
-        self.register_handler(EventType.REQUEST_ALL_POSITIONS_DATA.value, self._handle_request_all_positions_data)
-        self.register_handler(
-            EventType.REQUEST_PURCHASE_PRICE_FOR_SELL_UPDATE.value, self._handle_request_purchase_price_for_sell_update
+        self.handlers.update(
+            {
+                EventType.ADD_POSITION_REQUEST.value: self._handle_add_position_request,
+                EventType.SELL_POSITION_REQUEST.value: self._handle_sell_position_request,
+                EventType.REQUEST_LAST_PURCHASE_PRICE.value: self._handle_request_last_purchase_price,
+                EventType.REQUEST_OPENED_POSITIONS.value: self._handle_request_opened_positions,
+                EventType.REQUEST_COUNT_OPENED_POSITIONS.value: self._handle_request_count_opened_positions,
+                EventType.REQUEST_MAX_SALE_PRICE.value: self._handle_request_max_sale_price,
+                EventType.REQUEST_ALL_POSITIONS_DATA.value: self._handle_request_all_positions_data,
+                EventType.REQUEST_PURCHASE_PRICE_FOR_SELL_UPDATE.value: (
+                    self._handle_request_purchase_price_for_sell_update
+                ),
+                EventType.SELL_PRICE_UPDATE_IN_DB_REQUESTED.value: self._handle_update_sell_price_request,
+                EventType.CANCEL_EVENTS_REQUEST.value: self._handle_cancel_events_request,
+                EventType.CANCEL_POSITIONS_REQUEST.value: self._handle_cancel_positions_request,
+            }
         )
-        self.register_handler(EventType.SELL_PRICE_UPDATE_IN_DB_REQUESTED.value, self._handle_update_sell_price_request)
-        self.register_handler(EventType.CANCEL_EVENTS_REQUEST.value, self._handle_cancel_events_request)
-        self.register_handler(EventType.CANCEL_POSITIONS_REQUEST.value, self._handle_cancel_positions_request)
 
-        runtime.info(f"[{self.name}] Event handlers registered.")
+        runtime.info("[%s] Event handlers registered.", self.name)
 
     def run(self):
         """
         The main loop for the DatabaseManager thread.
         This method will start the PubSubClient's connection and message processing.
         """
-        runtime.info(f"[{self.name}] Thread starting PubSubClient connection.")
+        runtime.info("[%s] Thread starting PubSubClient connection.", self.name)
+        self._schedule_optimize()
         self.start()  # Call the start method inherited from PubSubClient
-        runtime.info(f"[{self.name}] Thread stopped PubSubClient connection.")
+        runtime.info("[%s] Thread stopped PubSubClient connection.", self.name)
 
     def stop(self):
-        """Signals the DatabaseManager thread to stop by disconnecting the Socket.IO client."""
-        runtime.info(f"[{self.name}] Disconnecting PubSubClient to stop thread.")
-        self.sio.disconnect()
-        self._stop_event.set()
+        """Signals the DatabaseManager thread to stop by disconnecting the Socket.IO client, then closes it."""
+        runtime.info("[%s] Disconnecting PubSubClient to stop thread.", self.name)
+        self._shutdown_event.set()
+        self.close()
+        self._message_ids_low.set()
+
+    def close(self):
+        """
+        Handles the messages already received, writes the positions they added, publishes the results, and only
+        then closes the database connections.
+        """
+        self._stop_consuming()
+        # The adds queued by those messages are written last; their POSITION_OPENED still needs publishing
+        self._add_queue.put(None)
+        self._add_drainer.join()
+        self._stop_publishing()
+        # _stop_event is set, so the timer is no longer re-armed; a PRAGMA optimize under way is waited for
+        with self._optimize_lock:
+            timer = self._optimize_timer
+        if timer is not None:
+            timer.cancel()
+            timer.join()
+        self._writer_pool.close()
+        self._reader_pool.close()
 
     # --- Event Handlers (working purely with primitive types/dicts) ---
 
     def _handle_add_position_request(self, position_data_dict: Dict[str, Any]):
-        conn = self._get_db_connection()
+        """
+        Queues the position for the add-position drainer, which inserts it in a batch.
+        """
         try:
-            cursor = conn.cursor()
-            timestamp_now = datetime.now().isoformat()
-
-            cursor.execute(
-                """
-                INSERT INTO positions (id, purchase_price, number_of_tokens, expected_sale_price,
-                                     next_purchase_price, variations, timestamp, status, pair, pool_name)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """,
-                (
-                    position_data_dict["id"],
-                    position_data_dict["purchase_price"],
-                    position_data_dict["number_of_tokens"],
-                    position_data_dict["expected_sale_price"],
-                    position_data_dict["next_purchase_price"],
-                    position_data_dict["variations"],  # Already a JSON string from PositionMapper
-                    position_data_dict["timestamp"],
-                    "open",
-                    position_data_dict["pair"],
-                    position_data_dict["pool_name"],
-                ),
-            )
-            cursor.execute(
-                """
-                INSERT INTO position_events (position_id, event_type, timestamp)
-                VALUES (?, ?, ?)
-            """,
-                (position_data_dict["id"], Operation.BUY.value, timestamp_now),
-            )
-            conn.commit()
-            # Pass message_id as an auto-generated UUID
-            self.publish(
-                EventType.POSITION_OPENED.value, json.dumps(position_data_dict), self.consumer, message_id=str(uuid4())
+            row = (
+                position_data_dict["id"],
+                position_data_dict["purchase_price"],
+                position_data_dict["number_of_tokens"],
+                position_data_dict["expected_sale_price"],
+                position_data_dict["next_purchase_price"],
+                position_data_dict["variations"],  # Already a JSON string from PositionMapper
+                position_data_dict["timestamp"],
+                "open",
+                position_data_dict["pair"],
+                position_data_dict["pool_name"],
             )
         except Exception as e:
-            runtime.exception(f"[{self.name}] Error adding position: {e}")
-            conn.rollback()
-        finally:
-            conn.close()
+            runtime.exception("[%s] Error adding position: %s", self.name, e)
+            return
+        event = (position_data_dict["id"], _OP_BUY, _now_ms())
+        self._add_queue.put((row, event, position_data_dict))
+
+    def _wait_for_adds(self):
+        """
+        Blocks until every add-position request queued so far is written. Called by each handler other than
+        ADD_POSITION_REQUEST before it touches the database, so it reads (or sells, or updates) the positions
+        added by earlier messages. Returns at once when nothing is pending.
+        """
+        if not self._add_queue.unfinished_tasks:
+            return
+        barrier = threading.Event()
+        self._add_queue.put(barrier)  # ends the drainer's batch window early
+        barrier.wait()
+
+    def _drain_add_queue(self):
+        """
+        Collects queued add-position requests for up to ADD_BATCH_WINDOW_SECONDS or ADD_BATCH_MAX items
+        and writes each batch in a single transaction. A barrier Event ends the batch early and is set once
+        the batch is written; a None item stops the drainer.
+        """
+        add_queue = self._add_queue
+        running = True
+        while running:
+            batch: List[_AddItem] = []
+            barrier: Optional[threading.Event] = None
+            deadline = None
+            while len(batch) < self.ADD_BATCH_MAX:
+                if deadline is None:
+                    item = add_queue.get()  # nothing collected yet: wait for the next request
+                else:
+                    timeout = deadline - time.monotonic()
+                    if timeout <= 0:
+                        break
+                    try:
+                        item = add_queue.get(timeout=timeout)
+                    except queue.Empty:
+                        break
+                if item is None:
+                    running = False
+                    add_queue.task_done()
+                    break
+                if isinstance(item, threading.Event):
+                    barrier = item
+                    break
+                batch.append(item)
+                if deadline is None:
+                    deadline = time.monotonic() + self.ADD_BATCH_WINDOW_SECONDS
+
+            if batch and not self._insert_positions(batch) and len(batch) > 1:
+                # One bad row must not drop the whole batch: retry the items one by one
+                for single in batch:
+                    self._insert_positions([single])
+            for _ in batch:
+                add_queue.task_done()
+            if barrier is not None:
+                barrier.set()
+                add_queue.task_done()
+
+    def _insert_positions(self, batch: List[_AddItem]) -> bool:
+        with self._writer_pool.acquire() as conn:
+            try:
+                with _immediate_transaction(conn) as cursor:
+                    cursor.executemany(_SQL_INSERT_POSITION, [row + (event[2],) for row, event, _ in batch])
+                    cursor.executemany(_SQL_INSERT_POSITION_EVENT, [event for _, event, _ in batch])
+            except Exception as e:
+                runtime.exception("[%s] Error adding %s position(s): %s", self.name, len(batch), e)
+                return False
+
+        for _, _, position_data_dict in batch:
+            self._publish_event(EventType.POSITION_OPENED, position_data_dict)
+        return True
 
     def _handle_sell_position_request(self, position_id: str):
-        conn = self._get_db_connection()
-        try:
-            cursor = conn.cursor()
-            timestamp_now = datetime.now().isoformat()
-            cursor.execute(
-                """
-                UPDATE positions SET status = 'closed' WHERE id = ?
-            """,
-                (position_id,),
-            )
-            cursor.execute(
-                """
-                INSERT INTO position_events (position_id, event_type, timestamp)
-                VALUES (?, ?, ?)
-            """,
-                (position_id, Operation.SELL.value, timestamp_now),
-            )
-            conn.commit()
-            self.publish(EventType.POSITION_SOLD.value, json.dumps(position_id), self.consumer, message_id=str(uuid4()))
-        except Exception as e:
-            runtime.exception(f"[{self.name}] Error selling position {position_id}: {e}")
-            conn.rollback()
-        finally:
-            conn.close()
+        self._wait_for_adds()
+        with self._writer_pool.acquire() as conn:
+            try:
+                timestamp_now = _now_ms()
+                with _immediate_transaction(conn) as cursor:
+                    cursor.execute(_SQL_CLOSE_POSITION, (position_id,))
+                    cursor.execute(_SQL_INSERT_POSITION_EVENT, (position_id, _OP_SELL, timestamp_now))
+            except Exception as e:
+                runtime.exception("[%s] Error selling position %s: %s", self.name, position_id, e)
+                return
+        self._publish_event(EventType.POSITION_SOLD, position_id)
 
     def _handle_cancel_events_request(self, db_path: str):
-        conn = self._get_db_connection()
-        try:
-            cursor = conn.cursor()
-            cursor.execute(
-                """
-                INSERT INTO position_events (position_id, event_type, timestamp)
-                SELECT position_id, ? AS event_type, CURRENT_TIMESTAMP AS timestamp
-                FROM position_events
-                WHERE event_type = ?;
-            """,
-                (Operation.SELL.value, Operation.BUY.value),
-            )
-            conn.commit()
-            self.publish(EventType.EVENTS_CANCELLED.value, json.dumps(True), self.consumer, message_id=str(uuid4()))
-        except Exception as e:
-            runtime.exception(f"[{self.name}] Error cancelling events: {e}")
-            conn.rollback()
-            self.publish(EventType.EVENTS_CANCELLED.value, json.dumps(False), self.consumer, message_id=str(uuid4()))
-        finally:
-            conn.close()
+        self._wait_for_adds()
+        with self._writer_pool.acquire() as conn:
+            try:
+                with _immediate_transaction(conn) as cursor:
+                    cursor.execute(_SQL_CANCEL_EVENTS, (_OP_SELL, _now_ms(), _OP_BUY))
+                cancelled = True
+            except Exception as e:
+                runtime.exception("[%s] Error cancelling events: %s", self.name, e)
+                cancelled = False
+        self._publish_event(EventType.EVENTS_CANCELLED, cancelled)
 
     def _handle_cancel_positions_request(self, db_path: str):
-        conn = self._get_db_connection()
-        try:
-            cursor = conn.cursor()
-            cursor.execute(
-                """
-                UPDATE positions
-                SET status = 'closed'
-                WHERE status = 'open';
-            """
-            )
-            conn.commit()
-            self.publish(EventType.POSITIONS_CLOSED.value, json.dumps(True), self.consumer, message_id=str(uuid4()))
-        except Exception as e:
-            runtime.exception(f"[{self.name}] Error cancelling positions: {e}")
-            conn.rollback()
-            self.publish(EventType.POSITIONS_CLOSED.value, json.dumps(False), self.consumer, message_id=str(uuid4()))
-        finally:
-            conn.close()
+        self._wait_for_adds()
+        with self._writer_pool.acquire() as conn:
+            try:
+                with _immediate_transaction(conn) as cursor:
+                    cursor.execute(_SQL_CLOSE_OPEN_POSITIONS)
+                closed = True
+            except Exception as e:
+                runtime.exception("[%s] Error cancelling positions: %s", self.name, e)
+                closed = False
+        self._publish_event(EventType.POSITIONS_CLOSED, closed)
 
     def _handle_request_last_purchase_price(self, pools_names: Optional[List[str]] = None):
-        conn = self._get_db_connection()
-        try:
-            cursor = conn.cursor()
-            if pools_names:
-                placeholders = ", ".join("?" for _ in pools_names)
-                # nosec B608 - Safe parameterized query with validated placeholders
-                query = f"""
-                    SELECT purchase_price
-                    FROM positions
-                    WHERE status = 'open' AND pool_name IN ({placeholders})
-                    ORDER BY timestamp DESC
-                    LIMIT 1
-                """
-                cursor.execute(query, pools_names)
-            else:
-                query = """
-                    SELECT purchase_price
-                    FROM positions
-                    WHERE status = 'open'
-                    ORDER BY timestamp DESC
-                    LIMIT 1
-                """
-                cursor.execute(query)
-            row = cursor.fetchone()
-            output_price_float = row[0] if row else 0.0
-            self.publish(
-                EventType.LAST_PURCHASE_PRICE_RETRIEVED.value,
-                json.dumps(output_price_float),
-                self.consumer,
-                message_id=str(uuid4()),
-            )
-        except Exception as e:
-            runtime.exception(f"[{self.name}] Error retrieving last purchase price: {e}")
-            self.publish(
-                EventType.LAST_PURCHASE_PRICE_RETRIEVED.value, json.dumps(0.0), self.consumer, message_id=str(uuid4())
-            )
-        finally:
-            conn.close()
+        self._wait_for_adds()
+        with self._reader_pool.acquire() as conn:
+            try:
+                with closing(conn.cursor()) as cursor:
+                    if pools_names:
+                        cursor.execute(*_in_query(_SQL_LAST_PURCHASE_PRICE_IN, pools_names))
+                    else:
+                        cursor.execute(_SQL_LAST_PURCHASE_PRICE)
+                    row = cursor.fetchone()
+            except Exception as e:
+                runtime.exception("[%s] Error retrieving last purchase price: %s", self.name, e)
+                row = None
+        output_price_float = row[0] if row else 0.0
+        self._publish_event(EventType.LAST_PURCHASE_PRICE_RETRIEVED, output_price_float)
 
     def _handle_request_opened_positions(self, pools_names: Optional[List[str]] = None):
-        conn = self._get_db_connection()
-        try:
-            cursor = conn.cursor()
-            if pools_names:
-                placeholders = ", ".join("?" for _ in pools_names)
-                # nosec B608 - Safe parameterized query with validated placeholders
-                query = f"""
-                    SELECT id, purchase_price, number_of_tokens, expected_sale_price, next_purchase_price,
-                           variations, timestamp, pair, pool_name, status
-                    FROM positions
-                    WHERE status = 'open' AND pool_name IN ({placeholders})
-                    ORDER BY timestamp ASC
-                """
-                cursor.execute(query, pools_names)
-            else:
-                query = """
-                    SELECT id, purchase_price, number_of_tokens, expected_sale_price, next_purchase_price,
-                           variations, timestamp, pair, pool_name, status
-                    FROM positions
-                    WHERE status = 'open'
-                    ORDER BY timestamp ASC
-                """
-                cursor.execute(query)
-            rows = cursor.fetchall()
-            headers = [description[0] for description in cursor.description]
-
-            raw_position_dicts = []
-            for row_data in rows:
-                raw_position_dicts.append(dict(zip(headers, row_data)))
-
-            self.publish(
-                EventType.OPENED_POSITIONS_RETRIEVED.value,
-                json.dumps(raw_position_dicts),
-                self.consumer,
-                message_id=str(uuid4()),
-            )
-        except Exception as e:
-            runtime.exception(f"[{self.name}] Error retrieving opened positions: {e}")
-            self.publish(
-                EventType.OPENED_POSITIONS_RETRIEVED.value, json.dumps([]), self.consumer, message_id=str(uuid4())
-            )
-        finally:
-            conn.close()
+        self._wait_for_adds()
+        with self._reader_pool.acquire() as conn:
+            try:
+                with closing(conn.cursor()) as cursor:
+                    if pools_names:
+                        cursor.execute(*_in_query(_SQL_OPENED_POSITIONS_IN, pools_names))
+                    else:
+                        cursor.execute(_SQL_OPENED_POSITIONS)
+                    positions_json = cursor.fetchone()[0]
+            except Exception as e:
+                runtime.exception("[%s] Error retrieving opened positions: %s", self.name, e)
+                self._publish_event(
+                    EventType.OPENED_POSITIONS_RETRIEVED, {column: [] for column in _OPENED_POSITIONS_COLUMNS}
+                )
+                return
+        self._publish_event(EventType.OPENED_POSITIONS_RETRIEVED, orjson.Fragment(positions_json))
 
     def _handle_request_count_opened_positions(self, pools_names: Optional[List[str]] = None):
-        conn = self._get_db_connection()
-        try:
-            cursor = conn.cursor()
-            if pools_names:
-                placeholders = ", ".join("?" for _ in pools_names)
-                # nosec B608 - Safe parameterized query with validated placeholders
-                query = f"""
-                    SELECT COUNT(*)
-                    FROM positions
-                    WHERE status = 'open' AND pool_name IN ({placeholders})
-                """
-                cursor.execute(query, pools_names)
-            else:
-                query = """
-                    SELECT COUNT(*)
-                    FROM positions
-                    WHERE status = 'open'
-                """
-                cursor.execute(query)
-            count = cursor.fetchone()[0]
-            self.publish(
-                EventType.OPENED_POSITIONS_COUNT_RETRIEVED.value,
-                json.dumps(count),
-                self.consumer,
-                message_id=str(uuid4()),
-            )
-        except Exception as e:
-            runtime.exception(f"[{self.name}] Error counting opened positions: {e}")
-            self.publish(
-                EventType.OPENED_POSITIONS_COUNT_RETRIEVED.value, json.dumps(0), self.consumer, message_id=str(uuid4())
-            )
-        finally:
-            conn.close()
+        self._wait_for_adds()
+        with self._reader_pool.acquire() as conn:
+            try:
+                with closing(conn.cursor()) as cursor:
+                    if pools_names:
+                        cursor.execute(*_in_query(_SQL_COUNT_OPENED_POSITIONS_IN, pools_names))
+                    else:
+                        cursor.execute(_SQL_COUNT_OPENED_POSITIONS)
+                    count = cursor.fetchone()[0]
+            except Exception as e:
+                runtime.exception("[%s] Error counting opened positions: %s", self.name, e)
+                count = 0
+        self._publish_event(EventType.OPENED_POSITIONS_COUNT_RETRIEVED, count)
 
     def _handle_request_max_sale_price(self, pools_names: Optional[List[str]] = None):
-        conn = self._get_db_connection()
-        try:
-            cursor = conn.cursor()
-            if pools_names:
-                placeholders = ", ".join("?" for _ in pools_names)
-                # nosec B608 - Safe parameterized query with validated placeholders
-                query = f"""
-                    SELECT MAX(expected_sale_price)
-                    FROM positions
-                    WHERE status = 'open' AND pool_name IN ({placeholders})
-                """
-                cursor.execute(query, pools_names)
-            else:
-                query = """
-                    SELECT MAX(expected_sale_price)
-                    FROM positions
-                    WHERE status = 'open'
-                """
-                cursor.execute(query)
-            result = cursor.fetchone()
-            max_sale_price_float = result[0] if result and result[0] is not None else 0.0
-            self.publish(
-                EventType.MAX_SALE_PRICE_RETRIEVED.value,
-                json.dumps(max_sale_price_float),
-                self.consumer,
-                message_id=str(uuid4()),
-            )
-        except Exception as e:
-            runtime.exception(f"[{self.name}] Error retrieving max sale price: {e}")
-            self.publish(
-                EventType.MAX_SALE_PRICE_RETRIEVED.value, json.dumps(0.0), self.consumer, message_id=str(uuid4())
-            )
-        finally:
-            conn.close()
+        self._wait_for_adds()
+        with self._reader_pool.acquire() as conn:
+            try:
+                with closing(conn.cursor()) as cursor:
+                    if pools_names:
+                        cursor.execute(*_in_query(_SQL_MAX_SALE_PRICE_IN, pools_names))
+                    else:
+                        cursor.execute(_SQL_MAX_SALE_PRICE)
+                    result = cursor.fetchone()
+            except Exception as e:
+                runtime.exception("[%s] Error retrieving max sale price: %s", self.name, e)
+                result = None
+        max_sale_price_float = result[0] if result and result[0] is not None else 0.0
+        self._publish_event(EventType.MAX_SALE_PRICE_RETRIEVED, max_sale_price_float)
 
     def _handle_request_all_positions_data(self, message_payload: Any):
-        conn = self._get_db_connection()
-        try:
-            cursor = conn.cursor()
-            query = """
-                SELECT id, number_of_tokens, expected_sale_price, next_purchase_price,
-                       purchase_price, timestamp, status, pool_name, variations
-                FROM positions
-                ORDER BY timestamp ASC
-            """
-            cursor.execute(query)
-            rows = cursor.fetchall()
-            headers = [description[0] for description in cursor.description]
-            raw_position_dicts = []
-            for row_data in rows:
-                raw_position_dicts.append(dict(zip(headers, row_data)))
-            self.publish(
-                EventType.ALL_POSITIONS_RETRIEVED.value,
-                json.dumps(raw_position_dicts),
-                self.consumer,
-                message_id=str(uuid4()),
-            )
-        except Exception as e:
-            runtime.exception(f"[{self.name}] Error retrieving all positions data: {e}")
-            self.publish(
-                EventType.ALL_POSITIONS_RETRIEVED.value, json.dumps([]), self.consumer, message_id=str(uuid4())
-            )
-        finally:
-            conn.close()
+        self._wait_for_adds()
+        with self._reader_pool.acquire() as conn:
+            try:
+                with closing(conn.cursor()) as cursor:
+                    cursor.execute(_SQL_ALL_POSITIONS)
+                    positions_json = cursor.fetchone()[0]
+            except Exception as e:
+                runtime.exception("[%s] Error retrieving all positions data: %s", self.name, e)
+                self._publish_event(EventType.ALL_POSITIONS_RETRIEVED, [])
+                return
+        self._publish_event(EventType.ALL_POSITIONS_RETRIEVED, orjson.Fragment(positions_json))
 
     def _handle_request_purchase_price_for_sell_update(
         self, message_payload: Dict[str, Any]
@@ -453,6 +737,8 @@ class DatabaseManager(threading.Thread, PubSubClient):
         """
         Handles the request to retrieve purchase price for sell update.
         message_payload is expected to be a dict containing 'position_id' and 'percentage_change'.
+        The new sell price is computed and stored by a single UPDATE, then SELL_PRICE_UPDATED is published
+        directly, without a round-trip through SELL_PRICE_UPDATE_IN_DB_REQUESTED.
         """
         # Parse the message_payload (which is currently a JSON string, so load it)
         # Note: Your PubSubClient.on_message passes `message` as already processed (data["message"])
@@ -470,42 +756,28 @@ class DatabaseManager(threading.Thread, PubSubClient):
 
         if position_id is None or percentage_change is None:
             runtime.warning(
-                f"[{self.name}] Received malformed REQUEST_PURCHASE_PRICE_FOR_SELL_UPDATE payload: {payload}"
+                "[%s] Received malformed REQUEST_PURCHASE_PRICE_FOR_SELL_UPDATE payload: %s", self.name, payload
             )
             return  # Or publish an error event
 
-        conn = self._get_db_connection()
-        try:
-            cursor = conn.cursor()
-            cursor.execute(
-                """
-                SELECT purchase_price FROM positions WHERE id = ?
-            """,
-                (position_id,),
-            )
-            row = cursor.fetchone()
-
-            if not row:
-                self.publish(
-                    EventType.POSITION_NOT_FOUND_FOR_SELL_UPDATE.value,
-                    json.dumps(position_id),
-                    self.consumer,
-                    message_id=str(uuid4()),
-                )
+        self._wait_for_adds()
+        with self._writer_pool.acquire() as conn:
+            try:
+                with _immediate_transaction(conn) as cursor:
+                    if _RETURNING_SUPPORTED:
+                        cursor.execute(_SQL_APPLY_SELL_PERCENTAGE_RETURNING, (percentage_change, position_id))
+                    else:
+                        cursor.execute(_SQL_APPLY_SELL_PERCENTAGE, (percentage_change, position_id))
+                        cursor.execute(_SQL_SALE_PRICE_BY_ID, (position_id,))
+                    rows = cursor.fetchall()
+            except Exception as e:
+                runtime.exception("[%s] Error requesting purchase price for sell update: %s", self.name, e)
                 return
 
-            current_purchase_price = row[0]
-            new_sell_price = current_purchase_price * (1 + (percentage_change / 100))
-            self.publish(
-                EventType.SELL_PRICE_UPDATE_IN_DB_REQUESTED.value,
-                json.dumps({"position_id": position_id, "new_sell_price": new_sell_price}),
-                self.consumer,
-                message_id=str(uuid4()),
-            )
-        except Exception as e:
-            runtime.exception(f"[{self.name}] Error requesting purchase price for sell update: {e}")
-        finally:
-            conn.close()
+        if not rows:
+            self._publish_event(EventType.POSITION_NOT_FOUND_FOR_SELL_UPDATE, position_id)
+            return
+        self._publish_event(EventType.SELL_PRICE_UPDATED, {"position_id": position_id, "new_sell_price": rows[0][0]})
 
     def _handle_update_sell_price_request(self, message_payload: Dict[str, Any]):  # Accepts message_payload
         """
@@ -520,29 +792,17 @@ class DatabaseManager(threading.Thread, PubSubClient):
         new_sell_price = payload.get("new_sell_price")
 
         if position_id is None or new_sell_price is None:
-            runtime.warning(f"[{self.name}] Received malformed SELL_PRICE_UPDATE_IN_DB_REQUESTED payload: {payload}")
+            runtime.warning("[%s] Received malformed SELL_PRICE_UPDATE_IN_DB_REQUESTED payload: %s", self.name, payload)
             return  # Or publish an error event
 
-        conn = self._get_db_connection()
-        try:
-            cursor = conn.cursor()
-            cursor.execute(
-                """
-                UPDATE positions
-                SET expected_sale_price = ?
-                WHERE id = ?
-            """,
-                (new_sell_price, position_id),
-            )
-            conn.commit()
-            self.publish(
-                EventType.SELL_PRICE_UPDATED.value,
-                json.dumps({"position_id": position_id, "new_sell_price": new_sell_price}),
-                self.consumer,
-                message_id=str(uuid4()),
-            )
-        except Exception as e:
-            runtime.exception(f"[{self.name}] Error updating sell price for position {position_id}: {e}")
-            conn.rollback()
-        finally:
-            conn.close()
+        self._wait_for_adds()
+        with self._writer_pool.acquire() as conn:
+            try:
+                with _immediate_transaction(conn) as cursor:
+                    cursor.execute(_SQL_UPDATE_SELL_PRICE, (new_sell_price, position_id))
+            except Exception as e:
+                runtime.exception("[%s] Error updating sell price for position %s: %s", self.name, position_id, e)
+                return
+        self._publish_event(
+            EventType.SELL_PRICE_UPDATED, {"position_id": position_id, "new_sell_price": new_sell_price}
+        )
@@ -7,9 +7,24 @@ from typing import Any, Type
 
 
 def setup_logging(log_level=logging.INFO, name: str = "runtime"):
-    """Set up logging configuration."""
+    """
+    Set up logging configuration. The LOG_LEVEL environment variable overrides log_level, as a level name
+    (e.g. WARNING) or number (e.g. 30); an unknown name is ignored with a warning.
+    """
     # Main logger configuration
     log = logging.getLogger(name)
+    # Already configured (module re-imported under another name, repeated call): adding a second
+    # StreamHandler would emit every record twice
+    if log.handlers:
+        return log
+    env_level = os.environ.get("LOG_LEVEL", "").strip()
+    unknown_level = None
+    if env_level.isdigit():
+        log_level = int(env_level)
+    elif isinstance(logging.getLevelName(env_level.upper()), int):
+        log_level = env_level.upper()
+    elif env_level:
+        unknown_level = env_level
     log.setLevel(log_level)
     formatter = logging.Formatter("%(asctime)s - %(levelname)s - %(message)s")
     # Create StreamHandler for console output
@@ -17,6 +32,8 @@ def setup_logging(log_level=logging.INFO, name: str = "runtime"):
     stream_handler.setLevel(log_level)
     stream_handler.setFormatter(formatter)
     log.addHandler(stream_handler)
+    if unknown_level is not None:
+        log.warning("Unknown LOG_LEVEL %r, using %s", unknown_level, logging.getLevelName(log.level))
     return log
 
 
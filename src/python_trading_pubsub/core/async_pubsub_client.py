@@ -0,0 +1,244 @@
+"""Asyncio PubSub client for real-time messaging."""
+
+import asyncio
+import inspect
+import logging
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Union
+
+import httpx
+import socketio
+
+from .codecs import OrjsonModule
+from .pubsub_message import PubSubMessage
+
+try:
+    import uvloop
+except ImportError:  # optional: the default asyncio event loop is used instead
+    uvloop = None
+
+logger = logging.getLogger(__name__)
+
+_JSON_HEADERS = {"Content-Type": "application/json"}
+# As in PubSubClient: every connection opened is kept alive, for http:// backends where HTTP/2 is not negotiated
+_HTTP_LIMITS = httpx.Limits(max_connections=32, max_keepalive_connections=32)
+
+# A handler is either a plain function, run in the default executor, or a coroutine function, awaited on the loop
+Handler = Callable[[Any], Union[None, Awaitable[None]]]
+
+
+class AsyncPubSubClient:
+    """
+    Client for publish-subscribe messaging system, on asyncio.
+
+    Same protocol and API shape as PubSubClient, but everything runs on one event loop: Socket.IO through
+    socketio.AsyncClient, the processing queue as an asyncio.Queue consumed by a task, and publishing through
+    an HTTP/2 httpx.AsyncClient, so publishes awaited together (e.g. with asyncio.gather) share one connection.
+    Requires the "async" extra (aiohttp, for the Socket.IO transport); uvloop is used when installed.
+    """
+
+    def __init__(
+        self, url: str, consumer: str, topics: List[str], serializer: str = "default", concurrent_topics: bool = False
+    ):
+        """
+        Initialize the asyncio PubSub client.
+
+        :param url: URL of the Socket.IO server, e.g., http://localhost:5000
+        :param consumer: Consumer name (e.g., 'alice')
+        :param topics: List of topics to subscribe to
+        :param serializer: Socket.IO packet encoding, "default" (JSON) or "msgpack", as for PubSubClient
+        :param concurrent_topics: If True, each topic's messages are handled by that topic's own task, so a slow
+                                  handler only delays its own topic. Order is kept within a topic, not across topics.
+        """
+        if serializer not in ("default", "msgpack"):
+            raise ValueError(f"Unknown serializer: {serializer}")
+        self.url = url.rstrip("/")
+        self.consumer = consumer
+        self.topics = topics
+        self.handlers: Dict[str, Handler] = {}  # topic → function or coroutine function
+        # Created on the running loop by start(): before Python 3.10, asyncio.Queue binds the loop it is created on
+        self.message_queue: Optional["asyncio.Queue[Optional[Dict[str, Any]]]"] = None
+        self._worker: Optional["asyncio.Task[None]"] = None
+        self.concurrent_topics = concurrent_topics
+        self._topic_queues: Dict[str, "asyncio.Queue[Optional[Dict[str, Any]]]"] = {}
+        self._topic_tasks: List["asyncio.Task[None]"] = []
+        self._http: Optional[httpx.AsyncClient] = None
+
+        # Create Socket.IO client with explicit reconnection settings
+        self.sio = socketio.AsyncClient(
+            reconnection=True,
+            reconnection_attempts=0,  # Infinite reconnection attempts
+            reconnection_delay=2000,  # Delay between reconnection attempts (ms)
+            reconnection_delay_max=10000,  # Max delay for reconnection
+            serializer=serializer,
+            json=OrjsonModule,  # same orjson codec as PubSubClient
+        )
+
+        # Register generic events
+        self.sio.on("connect", self.on_connect)
+        self.sio.on("message", self.on_message)
+        self.sio.on("disconnect", self.on_disconnect)
+        self.sio.on("new_message", self.on_new_message)
+
+    def register_handler(self, topic: str, handler_func: Handler) -> None:
+        """
+        Register a custom handler for a given topic.
+
+        :param topic: Topic to handle
+        :param handler_func: Function or coroutine function to call when a message is received.
+                             Plain functions run in the loop's default executor so they cannot block the loop.
+        """
+        self.handlers[topic] = handler_func
+
+    async def on_connect(self) -> None:
+        """Handle connection to the server."""
+        logger.info("[%s] Connected to server %s", self.consumer, self.url)
+        await self.sio.emit("subscribe", {"consumer": self.consumer, "topics": self.topics})
+
+    async def on_message(self, data: Dict[str, Any]) -> None:
+        """
+        Handle incoming messages by adding them to the queue.
+
+        :param data: Message data containing topic, message_id, message, and producer
+        """
+        logger.info("[%s] Queuing message: %s", self.consumer, data)
+        await self.message_queue.put(data)
+
+    async def process_queue(self) -> None:
+        """
+        Process messages from the queue until a None sentinel is received: one by one, or handed to the task of
+        their topic with concurrent_topics, in which case the topic tasks are drained before returning.
+        """
+        loop = asyncio.get_running_loop()
+        while True:
+            data = await self.message_queue.get()
+            if data is None:
+                break
+            if self.concurrent_topics:
+                self._topic_queue(data["topic"]).put_nowait(data)
+            else:
+                await self._handle(loop, data)
+        for topic_queue in self._topic_queues.values():
+            topic_queue.put_nowait(None)
+        await asyncio.gather(*self._topic_tasks)
+        self._topic_queues.clear()
+        self._topic_tasks.clear()
+
+    def _topic_queue(self, topic: str) -> "asyncio.Queue[Optional[Dict[str, Any]]]":
+        """Returns the queue of a topic, starting the task that consumes it on the topic's first message."""
+        topic_queue = self._topic_queues.get(topic)
+        if topic_queue is None:
+            topic_queue = self._topic_queues[topic] = asyncio.Queue()
+            self._topic_tasks.append(asyncio.ensure_future(self._process_topic(topic_queue)))
+        return topic_queue
+
+    async def _process_topic(self, topic_queue: "asyncio.Queue[Optional[Dict[str, Any]]]") -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            data = await topic_queue.get()
+            if data is None:
+                return
+            await self._handle(loop, data)
+
+    async def _handle(self, loop: asyncio.AbstractEventLoop, data: Dict[str, Any]) -> None:
+        """Runs the handler of a message's topic, then acknowledges the message."""
+        try:
+            topic = data["topic"]
+            message_id = data.get("message_id")
+            message = data["message"]
+            producer = data.get("producer")
+
+            logger.info(
+                "[%s] Processing message from topic [%s]: %s (from %s, ID=%s)",
+                self.consumer,
+                topic,
+                message,
+                producer,
+                message_id,
+            )
+
+            handler = self.handlers.get(topic)
+            if handler is not None:
+                try:
+                    if inspect.iscoroutinefunction(handler):
+                        await handler(message)
+                    else:
+                        await loop.run_in_executor(None, handler, message)
+                except Exception as e:
+                    logger.error("[%s] Error in handler for topic %s: %s", self.consumer, topic, e)
+            else:
+                logger.warning("[%s] No handler for topic %s.", self.consumer, topic)
+
+            # Notify consumption
+            await self.sio.emit(
+                "consumed",
+                {"consumer": self.consumer, "topic": topic, "message_id": message_id, "message": message},
+            )
+        except Exception as e:
+            logger.error("[%s] Error processing message: %s", self.consumer, e)
+
+    async def on_disconnect(self) -> None:
+        """Handle disconnection from the server."""
+        logger.info("[%s] Disconnected from server. Reconnection will be attempted automatically.", self.consumer)
+
+    async def on_new_message(self, data: Dict[str, Any]) -> None:
+        """Handle new message events."""
+        logger.info("[%s] New message: %s", self.consumer, data)
+
+    async def publish(self, topic: str, message: Any, producer: str, message_id: str) -> None:
+        """
+        Publish a message via HTTP POST to the pubsub backend.
+
+        :param topic: Topic to publish to
+        :param message: Message content, any JSON-serializable value (or an orjson.Fragment)
+        :param producer: Name of the producer
+        :param message_id: Unique message ID
+        """
+        msg = PubSubMessage.new(topic, message, producer, message_id)
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("[%s] Publishing to %s: %s", self.consumer, topic, msg.to_dict())
+        if self._http is None:
+            self._http = httpx.AsyncClient(
+                base_url=self.url,
+                timeout=30,
+                transport=httpx.AsyncHTTPTransport(http2=True, retries=3, limits=_HTTP_LIMITS),
+            )
+        try:
+            resp = await self._http.post("/publish", content=msg.encoded, headers=_JSON_HEADERS)
+            resp.raise_for_status()  # Raises HTTPStatusError for bad responses (4xx or 5xx)
+            if logger.isEnabledFor(logging.INFO):
+                logger.info("[%s] Publish response: %s", self.consumer, resp.json())
+        except httpx.TransportError as e:
+            logger.error("[%s] Connection error during publish: %s", self.consumer, e)
+        except httpx.HTTPStatusError as e:
+            logger.error(
+                "[%s] HTTP error during publish: %s - %s", self.consumer, e.response.status_code, e.response.text
+            )
+        except Exception as e:
+            logger.error("[%s] An unexpected error occurred during publish: %s", self.consumer, e)
+
+    async def start(self) -> None:
+        """Connect to the server and process messages until the connection is closed for good."""
+        logger.info("Starting client %s with topics %s", self.consumer, self.topics)
+        if self.message_queue is None:
+            self.message_queue = asyncio.Queue()
+        if self._worker is None:
+            self._worker = asyncio.ensure_future(self.process_queue())
+        await self.sio.connect(self.url)
+        await self.sio.wait()
+
+    async def close(self) -> None:
+        """Disconnect, let the processing task drain the queue, and close the HTTP client."""
+        await self.sio.disconnect()
+        if self._worker is not None:
+            await self.message_queue.put(None)
+            await self._worker
+            self._worker = None
+        if self._http is not None:
+            await self._http.aclose()
+            self._http = None
+
+    def run(self) -> None:
+        """Blocking entry point: runs start() on a uvloop event loop when uvloop is installed."""
+        if uvloop is not None:
+            asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+        asyncio.run(self.start())
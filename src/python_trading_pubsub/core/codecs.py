@@ -0,0 +1,23 @@
+"""Serializers handed to python-socketio by the PubSub clients."""
+
+import json
+from typing import Any
+
+import orjson
+
+
+class OrjsonModule:
+    """
+    Stand-in for the json module, handed to python-socketio so every emitted and received event is
+    encoded/decoded by orjson instead of the stdlib. Values orjson rejects (e.g. integers wider than
+    64 bits) fall back to the stdlib encoder.
+    """
+
+    @staticmethod
+    def dumps(obj: Any, **kwargs: Any) -> str:
+        try:
+            return orjson.dumps(obj).decode()
+        except TypeError:
+            return json.dumps(obj, **kwargs)
+
+    loads = staticmethod(orjson.loads)
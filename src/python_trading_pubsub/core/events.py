@@ -1,10 +1,14 @@
 """Event type definitions for the trading system."""
 
 from enum import Enum
+from typing import Dict
 
 
-class EventType(Enum):
-    """Enumeration of event types used in the trading system."""
+class EventType(str, Enum):
+    """
+    Enumeration of event types used in the trading system.
+    Members are also str instances, so they compare equal to (and hash like) the topic strings themselves.
+    """
 
     # Command Events (generally published by Orchestrator or services)
     COMMAND_ACTIONS_REGISTERED = "command_actions_registered"
@@ -37,3 +41,7 @@ class EventType(Enum):
 
     # Note: Other EventTypes (related to exchange, trading bot, indicators, Telegram, etc.)
     # are not included here as they are not directly used/published by DatabaseManager.
+
+
+# Topic string -> EventType, for resolving received topics with one dict lookup
+EVENT_BY_VALUE: Dict[str, EventType] = {event.value: event for event in EventType}
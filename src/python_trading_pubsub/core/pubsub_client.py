@@ -1,147 +1,596 @@
 """PubSub client for real-time messaging."""
 
+import collections
+import functools
+import itertools
 import logging
 import queue
 import threading
-from typing import Any, Callable, Dict, List
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Deque, Dict, Iterable, List, Optional, Tuple
 
-import requests
+import httpx
+import orjson
 import socketio
 
-from src.python_trading_pubsub.core.pubsub_message import PubSubMessage
+from .codecs import OrjsonModule
+from .pubsub_message import LazyMessage, PubSubMessage
+from .ringbuffer import RingBuffer
+from .topic_matcher import TopicMatcher
 
-# Configure logging for debugging
-logging.basicConfig(level=logging.INFO)
+# Library logging: no handler is configured at import, the application decides where records go
 logger = logging.getLogger(__name__)
+logger.addHandler(logging.NullHandler())
+
+_JSON_HEADERS = {"Content-Type": "application/json"}
+# Every connection a publish client opens is kept alive for reuse. HTTP/2 is negotiated over TLS only: against
+# an http:// backend concurrent publishes use one HTTP/1.1 connection each, so a keep-alive pool smaller than
+# the connection cap would close and reopen connections whenever more publishes overlap than it holds.
+_HTTP_LIMITS = httpx.Limits(max_connections=32, max_keepalive_connections=32)
+
+
+class _SocketIOClient(socketio.Client):
+    """
+    socketio.Client that hands "message" events straight to the bound on_message method, skipping the
+    per-frame lookup in the client's namespace/event handler table. Every other event (connect, disconnect,
+    ...) is rare and still goes through the regular dispatch, including its legacy-signature handling.
+    """
+
+    def __init__(self, on_message: Callable[[Dict[str, Any]], None], **kwargs: Any):
+        super().__init__(**kwargs)
+        self._on_message = on_message
+
+    def _trigger_event(self, event: str, namespace: str, *args: Any) -> Any:
+        if event == "message" and namespace == "/":
+            return self._on_message(*args)
+        return super()._trigger_event(event, namespace, *args)
+
+
+def _lazy_handler(handler_func: Callable[[Any], None]) -> Callable[[Any], None]:
+    """Wraps a raw handler so it receives its payload as a LazyMessage."""
+
+    @functools.wraps(handler_func)
+    def handle(message: Any) -> None:
+        handler_func(LazyMessage(message))
+
+    return handle
 
 
 class PubSubClient:
     """Client for publish-subscribe messaging system."""
 
-    def __init__(self, url: str, consumer: str, topics: List[str]):
+    # Slots in the incoming message ring buffer; on_message blocks once it is full
+    MESSAGE_QUEUE_SIZE = 1024
+    # publish_async: messages per /publish_batch request, and how long a batch may wait to fill
+    PUBLISH_BATCH_MAX = 100
+    PUBLISH_BATCH_INTERVAL_SECONDS = 0.01
+
+    def __init__(
+        self,
+        url: str,
+        consumer: str,
+        topics: List[str],
+        ack_batch_size: int = 1,
+        ack_flush_ms: float = 20,
+        concurrent_topics: bool = False,
+        max_workers: Optional[int] = None,
+        publish_workers: int = 0,
+        publish_connections: int = 1,
+        auto_batch: bool = False,
+        serializer: str = "default",
+        queue_maxsize: Optional[int] = None,
+        nack_when_full: bool = False,
+    ):
         """
         Initialize the PubSub client.
 
         :param url: URL of the Socket.IO server, e.g., http://localhost:5000
         :param consumer: Consumer name (e.g., 'alice')
         :param topics: List of topics to subscribe to
+        :param ack_batch_size: Acknowledgements sent per Socket.IO frame. 1 (default) emits one "consumed"
+                               event per message; above 1, acks are grouped into "consumed_batch" events,
+                               flushed when the batch is full or ack_flush_ms after its first ack.
+                               The server must handle "consumed_batch" before this is enabled.
+        :param ack_flush_ms: Longest time, in milliseconds, a batched acknowledgement waits before being sent
+        :param concurrent_topics: If True, each topic's handler runs on that topic's own worker thread, so a slow
+                                  handler only delays its own topic. Order is kept within a topic, not across topics.
+        :param max_workers: With concurrent_topics, caps the number of worker threads: topics are assigned to the
+                            workers in turn, as they are first seen, and a slow handler then also delays the other
+                            topics sharing its worker. None (default) gives every topic its own worker.
+        :param publish_workers: If above 0, publish() hands the POST to a pool of this many threads and returns
+                                a Future instead of waiting for the backend; 0 (default) publishes inline.
+        :param publish_connections: HTTP/2 connections to the backend that publishes are spread over, in turn.
+                                    One (default) multiplexes every publish over a single TCP connection; more
+                                    lift that connection's throughput ceiling for heavy concurrent publishing
+                                    (publish_workers, several producer threads). Messages published one after
+                                    the other from the same thread still arrive in order, since each POST is
+                                    answered before the next is sent; concurrent publishes were never ordered.
+        :param auto_batch: If True, publish() queues messages for /publish_batch by default (see publish_async),
+                           for bursty producers; publish(..., batch=False) still sends one message right away.
+        :param serializer: Socket.IO packet encoding: "default" (JSON text, encoded with orjson) or "msgpack"
+                           (binary MessagePack frames, needs the "msgpack" extra). The server must use the same one.
+        :param queue_maxsize: Messages received but not yet processed that are held in memory, rounded up to a power
+                              of two; defaults to MESSAGE_QUEUE_SIZE
+        :param nack_when_full: If True, a message arriving while the queue is full is refused with a "nack" event,
+                               for the server to deliver it again later, instead of blocking the receiving thread
+                               until the processing thread frees a slot. The server must handle "nack".
         """
+        if serializer not in ("default", "msgpack"):
+            raise ValueError(f"Unknown serializer: {serializer}")
         self.url = url.rstrip("/")
         self.consumer = consumer
         self.topics = topics
         self.handlers: Dict[str, Callable[[Any], None]] = {}  # topic → function
-        self.message_queue: queue.Queue[Dict[str, Any]] = queue.Queue()  # Queue for processing messages sequentially
+        # Topics handled on the receiving thread → (lock serializing the topic, its dispatch closure), see
+        # register_handler
+        self._direct_topics: Dict[str, Tuple[threading.Lock, Callable[[str, Any, str], None]]] = {}
+        # Handlers registered for wildcard filters ("prices/+", "orders/#"); created with the first one
+        self._topic_matcher: Optional[TopicMatcher[Callable[[Any], None]]] = None
+        # Socket.IO receiving threads (one per message) -> processing thread, processed sequentially
+        # None is the wake-up sentinel pushed by close()
+        maxsize = self.MESSAGE_QUEUE_SIZE if queue_maxsize is None else queue_maxsize
+        if maxsize < 1:
+            raise ValueError("queue_maxsize must be at least 1")
+        self.message_queue: RingBuffer[Optional[Dict[str, Any]]] = RingBuffer(1 << (maxsize - 1).bit_length())
+        self.nack_when_full = nack_when_full
         self.running = False
+        # One processing thread for the client's lifetime, started by the first on_connect: it outlives
+        # disconnections, idle on the empty queue, and only exits when close() sets the stop event.
+        self._stop_event = threading.Event()
+        self._worker = threading.Thread(target=self.process_queue, daemon=True, name=f"{consumer}-worker")
+        self.ack_batch_size = ack_batch_size
+        self.ack_flush_interval = ack_flush_ms / 1000
+        self._ack_buffer: List[Dict[str, Any]] = []
+        self._ack_lock = threading.Lock()  # acks may come from several topic workers
+        # Sends partial ack batches once ack_flush_ms has elapsed; only started on first use
+        self._ack_wakeup = threading.Event()
+        self._ack_closing = False
+        self._ack_flusher: Optional[threading.Thread] = None
+        # Each dispatching thread's closure from _make_dispatch, built on the thread's first message
+        self._dispatchers = threading.local()
+        self.concurrent_topics = concurrent_topics
+        if max_workers is not None and max_workers < 1:
+            raise ValueError("max_workers must be at least 1")
+        self.max_workers = max_workers
+        self._topic_executors: Dict[str, ThreadPoolExecutor] = {}  # topic → its worker
+        self._workers: List[ThreadPoolExecutor] = []  # distinct workers, shared by topics when max_workers is set
+
+        # HTTP/2 clients shared by every publish: concurrent publishes (topic workers, the batch flusher) are
+        # multiplexed as streams over each client's kept-alive connection instead of each needing its own
+        # (HTTP/1.1 without TLS: see _HTTP_LIMITS), and the clients are taken in turn. Retries only cover
+        # failures to connect: a POST that reached the server is never re-sent.
+        if publish_connections < 1:
+            raise ValueError("publish_connections must be at least 1")
+        self._http_clients = [
+            httpx.Client(
+                base_url=self.url,
+                timeout=30,
+                transport=httpx.HTTPTransport(http2=True, retries=3, limits=_HTTP_LIMITS),
+            )
+            for _ in range(publish_connections)
+        ]
+        self._http = self._http_clients[0]
+        self._next_http = itertools.cycle(self._http_clients).__next__  # one C call, safe from any thread
+
+        self.auto_batch = auto_batch
+        self._publish_pool: Optional[ThreadPoolExecutor] = (
+            ThreadPoolExecutor(max_workers=publish_workers, thread_name_prefix=f"{consumer}-publish")
+            if publish_workers > 0
+            else None
+        )
+
+        # Batched publishing (publish_async): the flusher thread is only started on first use
+        self._pub_queue: Deque[PubSubMessage] = collections.deque()
+        self._pub_wakeup = threading.Event()
+        self._pub_closing = False
+        self._pub_flusher: Optional[threading.Thread] = None
+        self._pub_flusher_lock = threading.Lock()
 
         # Create Socket.IO client with explicit reconnection settings
-        self.sio = socketio.Client(
+        self.sio = _SocketIOClient(
+            self.on_message,
             reconnection=True,
             reconnection_attempts=0,  # Infinite reconnection attempts
             reconnection_delay=2000,  # Delay between reconnection attempts (ms)
             reconnection_delay_max=10000,  # Max delay for reconnection
+            serializer=serializer,
+            json=OrjsonModule,  # packets with the default serializer, and the Engine.IO handshake
         )
 
-        # Register generic events
+        # Register generic events ("message" is also registered so the handler table stays complete)
         self.sio.on("connect", self.on_connect)
         self.sio.on("message", self.on_message)
         self.sio.on("disconnect", self.on_disconnect)
         self.sio.on("new_message", self.on_new_message)
 
-    def register_handler(self, topic: str, handler_func: Callable[[Any], None]) -> None:
+    def register_handler(
+        self, topic: str, handler_func: Callable[[Any], None], direct: bool = False, raw: bool = False
+    ) -> None:
         """
         Register a custom handler for a given topic.
 
-        :param topic: Topic to handle
+        :param topic: Topic to handle. May be an MQTT-style filter: "+" matches one topic level and a final "#"
+                      any number of them ("prices/+", "orders/#"); an exact registration takes precedence over
+                      filters, and among filters the most specific one.
         :param handler_func: Function to call when a message is received
+        :param direct: If True, the handler runs as soon as the message arrives, on the thread that received it,
+                       skipping the queue and the hop to the processing thread. python-engineio receives each
+                       message on a thread of its own: the topic's messages are handled one at a time, under a
+                       lock of the topic, but not necessarily in arrival order, and concurrently with the other
+                       topics. Only for quick handlers that do not depend on order. Exact topics only.
+        :param raw: If True, the handler receives a LazyMessage: a payload published as JSON text is only
+                    parsed when the handler reads it, instead of arriving as the text itself.
         """
+        if raw:
+            handler_func = _lazy_handler(handler_func)
+        if TopicMatcher.is_filter(topic):
+            if direct:
+                raise ValueError(f"Direct dispatch needs an exact topic, not a filter: {topic}")
+            if self._topic_matcher is None:
+                self._topic_matcher = TopicMatcher()
+            self._topic_matcher.add(topic, handler_func)
         self.handlers[topic] = handler_func
+        if direct:
+            self._direct_topics[topic] = (threading.Lock(), self._make_dispatch())
+        else:
+            self._direct_topics.pop(topic, None)
 
     def on_connect(self) -> None:
         """Handle connection to the server."""
-        logger.info(f"[{self.consumer}] Connected to server {self.url}")
+        logger.info("[%s] Connected to server %s", self.consumer, self.url)
         self.sio.emit("subscribe", {"consumer": self.consumer, "topics": self.topics})
-        if not self.running:
-            self.running = True
-            threading.Thread(target=self.process_queue, daemon=True).start()
+        self.running = True
+        if self._worker.ident is None:  # first connection; reconnections reuse the running thread
+            self._worker.start()
 
     def on_message(self, data: Dict[str, Any]) -> None:
         """
-        Handle incoming messages by adding them to the queue.
+        Handle incoming messages by adding them to the queue, or right away for topics registered as direct.
 
         :param data: Message data containing topic, message_id, message, and producer
         """
-        logger.info(f"[{self.consumer}] Queuing message: {data}")
-        self.message_queue.put(data)
+        topic = data.get("topic")
+        direct = self._direct_topics.get(topic)
+        if direct is not None:
+            lock, dispatch = direct
+            with lock:
+                dispatch(topic, data["message"], data.get("message_id"))
+            return
+        logger.info("[%s] Queuing message: %s", self.consumer, data)
+        if not self.nack_when_full:
+            self.message_queue.put(data)
+            return
+        try:
+            self.message_queue.put_nowait(data)
+        except queue.Full:
+            message_id = data.get("message_id")
+            logger.warning("[%s] Queue full, refusing message %s on topic %s", self.consumer, message_id, topic)
+            self.sio.emit("nack", {"consumer": self.consumer, "topic": topic, "message_id": message_id})
 
     def process_queue(self) -> None:
-        """Process messages from the queue one by one."""
-        while self.running:
+        """
+        Process messages from the queue one by one. Blocks while the queue is empty, including while
+        disconnected, and returns when woken by the None sentinel from close().
+        """
+        # Loop invariants bound to locals once, instead of attribute lookups on every message
+        get = self.message_queue.get
+        task_done = self.message_queue.task_done
+        # Inline dispatch only ever runs on this thread, so its closure is fetched once; topic workers
+        # go through _dispatch, which fetches their own
+        dispatch = self._dispatch if self.concurrent_topics else self._thread_dispatch()
+        topic_executor = self._topic_executor
+        info = logger.info
+        consumer = self.consumer
+        concurrent_topics = self.concurrent_topics
+        stop_event = self._stop_event
+        while True:
             try:
-                data = self.message_queue.get(timeout=1.0)
+                data = get()
+                if data is None:
+                    if stop_event.is_set():
+                        break
+                    continue
                 topic = data["topic"]
                 message_id = data.get("message_id")
                 message = data["message"]
-                producer = data.get("producer")
 
-                logger.info(
-                    f"[{self.consumer}] Processing message from topic [{topic}]: {message} "
-                    f"(from {producer}, ID={message_id})"
+                info(
+                    "[%s] Processing message from topic [%s]: %s (from %s, ID=%s)",
+                    consumer,
+                    topic,
+                    message,
+                    data.get("producer"),
+                    message_id,
                 )
 
-                if topic in self.handlers:
-                    try:
-                        self.handlers[topic](message)
-                    except Exception as e:
-                        logger.error(f"[{self.consumer}] Error in handler for topic {topic}: {e}")
+                if concurrent_topics:
+                    topic_executor(topic).submit(dispatch, topic, message, message_id)
                 else:
-                    logger.warning(f"[{self.consumer}] No handler for topic {topic}.")
+                    dispatch(topic, message, message_id)
 
-                # Notify consumption
-                self.sio.emit(
-                    "consumed",
-                    {"consumer": self.consumer, "topic": topic, "message_id": message_id, "message": message},
-                )
+                task_done()
+            except Exception as e:
+                logger.error("[%s] Error processing message: %s", consumer, e)
+        self._flush_acks()
+
+    def _topic_executor(self, topic: str) -> ThreadPoolExecutor:
+        """
+        Returns the single-thread executor of a topic, assigning one on the topic's first message: a new worker,
+        or once max_workers exist, the next worker in turn. A topic always runs on the same single thread,
+        which keeps its order.
+        """
+        executor = self._topic_executors.get(topic)
+        if executor is None:
+            workers = self._workers
+            if self.max_workers is None or len(workers) < self.max_workers:
+                name = topic if self.max_workers is None else f"worker-{len(workers)}"
+                executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"{self.consumer}-{name}")
+                workers.append(executor)
+            else:
+                executor = workers[len(self._topic_executors) % self.max_workers]
+            self._topic_executors[topic] = executor
+        return executor
+
+    def _dispatch(self, topic: str, message: Any, message_id: str) -> None:
+        """Runs the handler of a topic on one message, then acknowledges it."""
+        self._thread_dispatch()(topic, message, message_id)
+
+    def _thread_dispatch(self) -> Callable[[str, Any, str], None]:
+        """Returns the calling thread's dispatch closure, creating it on the thread's first message."""
+        try:
+            return self._dispatchers.dispatch
+        except AttributeError:
+            dispatch = self._dispatchers.dispatch = self._make_dispatch()
+            return dispatch
+
+    def _make_dispatch(self) -> Callable[[str, Any, str], None]:
+        """
+        Builds the dispatch function of one thread, or of one direct topic: the handler lookup, the emitter and
+        the "consumed" payload are bound once as closure variables instead of being read from self on every
+        message. The payload is reused from one message to the next, which is why each thread, and each direct
+        topic behind its lock, has its own (sio.emit encodes it before returning). The handler dict is bound by
+        reference, so handlers registered later are still found.
+        """
+        get_handler = self.handlers.get
+        emit = self.sio.emit
+        consumer = self.consumer
+        payload = {"consumer": consumer}
+        error = logger.error
 
-                self.message_queue.task_done()
-            except queue.Empty:
-                continue
+        def dispatch(topic: str, message: Any, message_id: str) -> None:
+            handler = get_handler(topic)
+            if handler is None and self._topic_matcher is not None:
+                handler = self._topic_matcher.match(topic)
+            if handler is not None:
+                try:
+                    handler(message)
+                except Exception as e:
+                    error("[%s] Error in handler for topic %s: %s", consumer, topic, e)
+            else:
+                logger.warning("[%s] No handler for topic %s.", consumer, topic)
+
+            # Notify consumption
+            try:
+                if self.ack_batch_size > 1:
+                    self._queue_ack(topic, message_id)
+                else:
+                    payload["topic"] = topic
+                    payload["message_id"] = message_id
+                    payload["message"] = message
+                    emit("consumed", payload)
             except Exception as e:
-                logger.error(f"[{self.consumer}] Error processing message: {e}")
+                error("[%s] Error acknowledging message %s: %s", consumer, message_id, e)
+
+        return dispatch
+
+    def _queue_ack(self, topic: str, message_id: str) -> None:
+        """Adds an acknowledgement to the pending batch, flushing it right away once it is full."""
+        if self._ack_flusher is None:
+            self._start_ack_flusher()
+        with self._ack_lock:
+            self._ack_buffer.append({"topic": topic, "message_id": message_id})
+            pending = len(self._ack_buffer)
+        if pending >= self.ack_batch_size:
+            self._flush_acks()
+        elif pending == 1:
+            self._ack_wakeup.set()  # a batch starts: the flusher sends it after ack_flush_ms at the latest
+
+    def _start_ack_flusher(self) -> None:
+        with self._ack_lock:
+            if self._ack_flusher is None:
+                self._ack_flusher = threading.Thread(target=self._run_ack_flusher, daemon=True)
+                self._ack_flusher.start()
+
+    def _run_ack_flusher(self) -> None:
+        """Sends each ack batch ack_flush_ms after it started, unless it filled up before, until close()."""
+        while True:
+            self._ack_wakeup.wait()
+            self._ack_wakeup.clear()
+            if not self._ack_closing:
+                self._ack_wakeup.wait(self.ack_flush_interval)  # cut short when the client is closing
+                self._ack_wakeup.clear()
+            self._flush_acks()
+            if self._ack_closing:
+                return
+
+    def _flush_acks(self) -> None:
+        """Sends the pending acknowledgements, if any, as one "consumed_batch" event."""
+        with self._ack_lock:
+            if not self._ack_buffer:
+                return
+            acks, self._ack_buffer = self._ack_buffer, []
+        try:
+            self.sio.emit("consumed_batch", {"consumer": self.consumer, "acks": acks})
+        except Exception as e:
+            logger.error("[%s] Error sending %s acknowledgement(s): %s", self.consumer, len(acks), e)
 
     def on_disconnect(self) -> None:
         """Handle disconnection from the server."""
-        logger.info(f"[{self.consumer}] Disconnected from server. Reconnection will be attempted automatically.")
-        self.running = False  # Stop queue processing until reconnected
+        logger.info("[%s] Disconnected from server. Reconnection will be attempted automatically.", self.consumer)
+        # The processing thread keeps going: messages already queued are still handled, then it waits for
+        # the next ones, delivered once reconnected
+        self.running = False
 
     def on_new_message(self, data: Dict[str, Any]) -> None:
         """Handle new message events."""
-        logger.info(f"[{self.consumer}] New message: {data}")
+        logger.info("[%s] New message: %s", self.consumer, data)
 
-    def publish(self, topic: str, message: Any, producer: str, message_id: str) -> None:
+    def publish(
+        self, topic: str, message: Any, producer: str, message_id: str, batch: Optional[bool] = None
+    ) -> "Optional[Future[bool]]":
         """
         Publish a message via HTTP POST to the pubsub backend.
 
         :param topic: Topic to publish to
-        :param message: Message content
+        :param message: Message content, any JSON-serializable value; it is encoded once, here.
+                        An orjson.Fragment is embedded as-is, for payloads that are already JSON.
         :param producer: Name of the producer
         :param message_id: Unique message ID
+        :param batch: If True, queue the message for the next /publish_batch request (see publish_async).
+                      None (default) follows the client's auto_batch setting.
+        :return: With publish_workers, a Future resolving to publish_sync's result; otherwise None,
+                 once the message is sent.
+        """
+        if self.auto_batch if batch is None else batch:
+            self.publish_async(topic, message, producer, message_id)
+            return None
+        if self._publish_pool is not None:
+            return self._publish_pool.submit(self.publish_sync, topic, message, producer, message_id)
+        self.publish_sync(topic, message, producer, message_id)
+        return None
+
+    def publish_sync(self, topic: str, message: Any, producer: str, message_id: str) -> bool:
+        """
+        Publish a message via HTTP POST in the calling thread and wait for the backend's answer.
+
+        :return: True if the backend accepted the message; failures are logged and return False
         """
         msg = PubSubMessage.new(topic, message, producer, message_id)
-        url = f"{self.url}/publish"
-        logger.info(f"[{self.consumer}] Publishing to {topic}: {msg.to_dict()}")
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("[%s] Publishing to %s: %s", self.consumer, topic, msg.to_dict())
+        return self._post("/publish", msg.encoded)
+
+    def publish_batch(self, messages: Iterable[Dict[str, Any]]) -> bool:
+        """
+        Publish several messages in one HTTP POST to /publish_batch, in the calling thread, and wait for the
+        backend's answer.
+
+        :param messages: Dicts with the same keys as publish's arguments: topic, message, producer, message_id
+        :return: True if the backend accepted the batch; failures are logged and return False
+        """
+        batch = [
+            {"topic": m["topic"], "message_id": m["message_id"], "message": m["message"], "producer": m["producer"]}
+            for m in messages
+        ]
+        return self._post_batch(batch)
+
+    def publish_async(self, topic: str, message: Any, producer: str, message_id: str) -> None:
+        """
+        Queue a message and return immediately. A background thread sends the queued messages
+        together, up to PUBLISH_BATCH_MAX per POST to /publish_batch, at most PUBLISH_BATCH_INTERVAL_SECONDS
+        after the first one was queued. Order is preserved; close() sends whatever is still queued.
+
+        :param topic: Topic to publish to
+        :param message: Message content, any JSON-serializable value
+        :param producer: Name of the producer
+        :param message_id: Unique message ID
+        """
+        if self._pub_flusher is None:
+            self._start_publish_flusher()
+        pub_queue = self._pub_queue
+        pub_queue.append(PubSubMessage.new(topic, message, producer, message_id))
+        # Wake the flusher when a batch starts or fills up; in between it is already on its way
+        if len(pub_queue) == 1 or len(pub_queue) >= self.PUBLISH_BATCH_MAX:
+            self._pub_wakeup.set()
+
+    def _start_publish_flusher(self) -> None:
+        with self._pub_flusher_lock:
+            if self._pub_flusher is None:
+                self._pub_flusher = threading.Thread(target=self._run_publish_flusher, daemon=True)
+                self._pub_flusher.start()
+
+    def _run_publish_flusher(self) -> None:
+        """Sends queued messages in batches until close() is called and the queue is drained."""
+        while True:
+            self._pub_wakeup.wait()
+            self._pub_wakeup.clear()
+            if not self._pub_closing and len(self._pub_queue) < self.PUBLISH_BATCH_MAX:
+                # Let the batch fill; cut short once it is full or the client is closing
+                self._pub_wakeup.wait(self.PUBLISH_BATCH_INTERVAL_SECONDS)
+                self._pub_wakeup.clear()
+            self._flush_publishes()
+            if self._pub_closing:
+                return
+
+    def _flush_publishes(self) -> None:
+        pub_queue = self._pub_queue
+        while pub_queue:
+            batch = []
+            while pub_queue and len(batch) < self.PUBLISH_BATCH_MAX:
+                batch.append(pub_queue.popleft().to_dict())
+            self._post_batch(batch)
+
+    def _post_batch(self, batch: List[Dict[str, Any]]) -> bool:
+        logger.info("[%s] Publishing batch of %s message(s)", self.consumer, len(batch))
+        return self._post("/publish_batch", orjson.dumps({"messages": batch}))
+
+    def _post(self, path: str, body: bytes) -> bool:
+        """POST an encoded JSON body to the pubsub backend; failures are logged, not raised, and return False."""
         try:
-            resp = requests.post(url, json=msg.to_dict(), timeout=30)
-            resp.raise_for_status()  # Raises HTTPError for bad responses (4xx or 5xx)
-            logger.info(f"[{self.consumer}] Publish response: {resp.json()}")
-        except requests.exceptions.ConnectionError as e:
-            logger.error(f"[{self.consumer}] Connection error during publish: {e}")
-        except requests.exceptions.HTTPError as e:
-            logger.error(f"[{self.consumer}] HTTP error during publish: {e.response.status_code} - {e.response.text}")
+            resp = self._next_http().post(path, content=body, headers=_JSON_HEADERS)
+            resp.raise_for_status()  # Raises HTTPStatusError for bad responses (4xx or 5xx)
+            if logger.isEnabledFor(logging.INFO):
+                logger.info("[%s] Publish response: %s", self.consumer, resp.json())
+            return True
+        except httpx.TransportError as e:
+            logger.error("[%s] Connection error during publish: %s", self.consumer, e)
+        except httpx.HTTPStatusError as e:
+            logger.error(
+                "[%s] HTTP error during publish: %s - %s", self.consumer, e.response.status_code, e.response.text
+            )
         except Exception as e:
-            logger.error(f"[{self.consumer}] An unexpected error occurred during publish: {e}")
+            logger.error("[%s] An unexpected error occurred during publish: %s", self.consumer, e)
+        return False
+
+    def close(self) -> None:
+        """
+        Disconnect, let the processing thread handle the messages already received and stop, wait for the topic
+        workers to finish their messages and send their pending acknowledgements, then send any batched messages
+        still queued, wait for in-flight publishes, and release the pooled HTTP connections. Handlers publish
+        until the topic workers are done, so publishing is shut down last.
+        """
+        self._stop_consuming()
+        self._stop_publishing()
+
+    def _stop_consuming(self) -> None:
+        """First half of close(): disconnects, then waits until every received message is handled and acked."""
+        self.sio.disconnect()  # no more on_message: the sentinel below is the last item queued
+        self._stop_event.set()
+        if self._worker.is_alive():
+            self.message_queue.put(None)
+            self._worker.join()
+        for executor in self._workers:
+            executor.shutdown(wait=True)
+        ack_flusher = self._ack_flusher
+        if ack_flusher is not None:
+            self._ack_closing = True
+            self._ack_wakeup.set()
+            ack_flusher.join()
+
+    def _stop_publishing(self) -> None:
+        """Second half of close(): sends what is still queued for publishing, then closes the HTTP clients."""
+        flusher = self._pub_flusher
+        if flusher is not None:
+            self._pub_closing = True
+            self._pub_wakeup.set()
+            flusher.join()
+        if self._publish_pool is not None:
+            self._publish_pool.shutdown(wait=True)
+        for http in self._http_clients:
+            http.close()
 
     def start(self) -> None:
         """Start the client and connect to the server."""
-        logger.info(f"Starting client {self.consumer} with topics {self.topics}")
+        logger.info("Starting client %s with topics %s", self.consumer, self.topics)
         self.sio.connect(self.url)
         self.sio.wait()
@@ -1,19 +1,31 @@
 """PubSub message data structure module."""
 
-from dataclasses import asdict, dataclass
-from typing import Any, Dict, Optional
-from uuid import uuid4
+import os
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Union
 
+import orjson
 
-@dataclass
+
+@dataclass(frozen=True)
 class PubSubMessage:
-    """Data class representing a PubSub message."""
+    """
+    Data class representing a PubSub message.
+    Immutable and slotted: instances carry no per-instance __dict__, which keeps them small and cheap to create.
+    """
+
+    # Declared by hand rather than with dataclass(slots=True), which needs Python 3.10
+    __slots__ = ("topic", "message_id", "message", "producer", "_encoded")
 
     topic: str
     message_id: str
     message: Any
     producer: str
 
+    def __reduce__(self):
+        # Rebuild through __init__: the default slots pickling restores fields with setattr, which frozen forbids
+        return PubSubMessage, (self.topic, self.message_id, self.message, self.producer)
+
     @staticmethod
     def new(topic: str, message: Any, producer: str, message_id: Optional[str] = None) -> "PubSubMessage":
         """
@@ -22,10 +34,12 @@ class PubSubMessage:
         :param topic: Topic of the message
         :param message: Message content
         :param producer: Producer name
-        :param message_id: Unique message ID (optional, defaults to UUID)
+        :param message_id: Unique message ID (optional, defaults to 32 random hex digits)
         :return: PubSubMessage instance
         """
-        return PubSubMessage(topic=topic, message_id=message_id or str(uuid4()), message=message, producer=producer)
+        return PubSubMessage(
+            topic=topic, message_id=message_id or os.urandom(16).hex(), message=message, producer=producer
+        )
 
     def to_dict(self) -> Dict[str, Any]:
         """
@@ -33,4 +47,56 @@ class PubSubMessage:
 
         :return: Dictionary representation of the message
         """
-        return asdict(self)
+        # Built by hand: dataclasses.asdict() deep-copies the message, which is wasted work for a
+        # payload that is only serialized, and fails on values such as orjson.Fragment.
+        return {"topic": self.topic, "message_id": self.message_id, "message": self.message, "producer": self.producer}
+
+    @property
+    def encoded(self) -> bytes:
+        """
+        The message serialized to JSON bytes, computed on first access and then reused.
+
+        :return: UTF-8 JSON encoding of to_dict()
+        """
+        try:
+            return self._encoded
+        except AttributeError:
+            encoded = orjson.dumps(self.to_dict())
+            object.__setattr__(self, "_encoded", encoded)  # cache slot, not a field: allowed despite frozen=True
+            return encoded
+
+
+class LazyMessage:
+    """
+    Payload handed to handlers registered with raw=True (see PubSubClient.register_handler). The producer
+    publishes it as JSON text (e.g. message=orjson.dumps(value).decode()), so decoding the Socket.IO packet
+    only copies a string; the text is parsed on first access to value, then reused. A handler that routes or
+    drops messages on the envelope alone never pays for parsing a large payload.
+
+    A payload that did not arrive as text (the producer sent a plain JSON value) is used as-is.
+    """
+
+    __slots__ = ("raw", "_value")
+
+    def __init__(self, raw: Union[str, bytes, Any]):
+        self.raw = raw
+        if not isinstance(raw, (str, bytes)):
+            self._value = raw  # already decoded along with the packet
+
+    @property
+    def value(self) -> Any:
+        """The parsed payload."""
+        try:
+            return self._value
+        except AttributeError:
+            value = self._value = orjson.loads(self.raw)
+            return value
+
+    def __getitem__(self, key: Any) -> Any:
+        return self.value[key]
+
+    def get(self, key: Any, default: Any = None) -> Any:
+        return self.value.get(key, default)
+
+    def __repr__(self) -> str:
+        return f"LazyMessage({self.raw!r})"
@@ -0,0 +1,110 @@
+"""Bounded multi-producer / single-consumer ring buffer."""
+
+import queue
+import threading
+import time
+from typing import Callable, Generic, List, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+class RingBuffer(Generic[T]):
+    """
+    Pre-allocated ring buffer for any number of producer threads and exactly one consumer thread.
+
+    Slots live in a power-of-two list addressed with ``index & mask``. Producers advance ``_head``
+    under ``_put_lock`` (python-engineio delivers each message on its own thread, and ``close()`` puts
+    its sentinel from yet another one); only the consumer advances ``_tail``, a single attribute store
+    that the GIL makes atomic, so reads take no lock at all.
+
+    A side only sleeps when it has to: the consumer on ``_ready`` while the buffer is empty, the
+    producer holding the lock on ``_space`` while it is full (back-pressure instead of unbounded growth
+    or dropped messages), with the other producers queued on the lock behind it. The sleeper clears its
+    event *then* re-checks the indices, and the other side advances its index *then* sets the event if
+    it is clear, so a wake-up cannot be lost; the event is only set (which takes its lock) when someone
+    may be waiting on it.
+
+    The API mirrors the subset of ``queue.Queue`` used by the client, including ``queue.Empty`` /
+    ``queue.Full`` on timeouts.
+    """
+
+    def __init__(self, capacity: int = 1024):
+        if capacity < 1 or capacity & (capacity - 1):
+            raise ValueError("capacity must be a power of two")
+        self._slots: List[Optional[T]] = [None] * capacity
+        self._mask = capacity - 1
+        self._head = 0  # next slot to write, advanced under _put_lock
+        self._put_lock = threading.Lock()
+        self._tail = 0  # next slot to read, owned by the consumer
+        self._ready = threading.Event()  # consumer sleeps on it while empty
+        self._space = threading.Event()  # producer sleeps on it while full
+        self._space.set()
+
+    @property
+    def capacity(self) -> int:
+        return self._mask + 1
+
+    def put(self, item: T, block: bool = True, timeout: Optional[float] = None) -> None:
+        """Writes item to the next slot, waiting for a free one if the buffer is full."""
+        deadline = None if timeout is None or not block else time.monotonic() + timeout
+        if not self._put_lock.acquire(timeout=-1 if deadline is None else timeout):
+            raise queue.Full
+        try:
+            if self._head - self._tail > self._mask:
+                if not block:
+                    raise queue.Full
+                remaining = None if deadline is None else deadline - time.monotonic()
+                self._wait(self._space, lambda: self._head - self._tail > self._mask, remaining, queue.Full)
+            head = self._head  # read once there is room, never before a wait
+            self._slots[head & self._mask] = item
+            self._head = head + 1
+        finally:
+            self._put_lock.release()
+        if not self._ready.is_set():
+            self._ready.set()
+
+    def put_nowait(self, item: T) -> None:
+        self.put(item, block=False)
+
+    def get(self, block: bool = True, timeout: Optional[float] = None) -> T:
+        """Reads the oldest item, waiting for one if the buffer is empty."""
+        tail = self._tail
+        if self._head == tail:
+            if not block:
+                raise queue.Empty
+            self._wait(self._ready, lambda: self._head == self._tail, timeout, queue.Empty)
+        index = tail & self._mask
+        item = self._slots[index]
+        self._slots[index] = None  # do not keep the message alive until the slot is reused
+        self._tail = tail + 1
+        if not self._space.is_set():
+            self._space.set()
+        return item  # type: ignore[return-value]
+
+    def get_nowait(self) -> T:
+        return self.get(block=False)
+
+    @staticmethod
+    def _wait(event: threading.Event, blocked: Callable[[], bool], timeout: Optional[float], error: type) -> None:
+        """Sleeps on event until blocked() is false, raising error once timeout seconds have passed."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            event.clear()
+            if not blocked():  # re-check after clearing: the other side may have moved in between
+                return
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                raise error
+            event.wait(remaining)
+
+    def qsize(self) -> int:
+        return self._head - self._tail
+
+    def empty(self) -> bool:
+        return self._head == self._tail
+
+    def full(self) -> bool:
+        return self._head - self._tail > self._mask
+
+    def task_done(self) -> None:
+        """No-op, for queue.Queue compatibility: the buffer does not track unfinished tasks."""
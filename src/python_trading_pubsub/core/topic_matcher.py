@@ -0,0 +1,76 @@
+"""MQTT-style topic filter matching."""
+
+from typing import Dict, Generic, List, Optional, TypeVar
+
+T = TypeVar("T")
+
+_MISSING = object()
+
+
+class _Node:
+    __slots__ = ("children", "value")
+
+    def __init__(self):
+        self.children: Dict[str, "_Node"] = {}
+        self.value = _MISSING
+
+
+class TopicMatcher(Generic[T]):
+    """
+    Trie of MQTT-style topic filters, one level per "/"-separated segment. "+" matches exactly one level
+    and "#", only allowed as the last level, matches that level and everything below it, including
+    nothing ("prices/#" matches "prices").
+
+    match() walks the topic's levels once whatever the number of filters, only branching where a "+" or
+    "#" filter sits next to a literal one. When several filters match, the most specific wins: a literal
+    level beats "+", which beats "#".
+    """
+
+    def __init__(self):
+        self._root = _Node()
+
+    @staticmethod
+    def is_filter(topic: str) -> bool:
+        """Whether a topic string contains wildcards, i.e. has to be registered here rather than matched exactly."""
+        return "+" in topic or "#" in topic
+
+    def add(self, topic_filter: str, value: T) -> None:
+        """Adds a filter, or replaces the value of an existing one."""
+        levels = topic_filter.split("/")
+        for position, level in enumerate(levels):
+            if ("+" in level or "#" in level) and len(level) > 1:
+                raise ValueError(f"Wildcards must take a whole topic level: {topic_filter}")
+            if level == "#" and position != len(levels) - 1:
+                raise ValueError(f"'#' is only allowed as the last topic level: {topic_filter}")
+        node = self._root
+        for level in levels:
+            child = node.children.get(level)
+            if child is None:
+                child = node.children[level] = _Node()
+            node = child
+        node.value = value
+
+    def match(self, topic: str) -> Optional[T]:
+        """Returns the value of the most specific filter matching topic, or None."""
+        value = self._match(self._root, topic.split("/"), 0)
+        return None if value is _MISSING else value
+
+    def _match(self, node: _Node, levels: List[str], index: int):
+        children = node.children
+        if index == len(levels):
+            if node.value is not _MISSING:
+                return node.value
+            multi = children.get("#")
+            return _MISSING if multi is None else multi.value
+        child = children.get(levels[index])
+        if child is not None:
+            value = self._match(child, levels, index + 1)
+            if value is not _MISSING:
+                return value
+        single = children.get("+")
+        if single is not None:
+            value = self._match(single, levels, index + 1)
+            if value is not _MISSING:
+                return value
+        multi = children.get("#")
+        return _MISSING if multi is None else multi.value
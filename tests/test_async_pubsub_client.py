@@ -0,0 +1,118 @@
+"""Tests for AsyncPubSubClient class."""
+
+import asyncio
+import threading
+from unittest.mock import AsyncMock, Mock, patch
+
+import orjson
+import pytest
+
+from src.python_trading_pubsub.core.async_pubsub_client import AsyncPubSubClient
+from src.python_trading_pubsub.core.codecs import OrjsonModule
+
+
+class TestAsyncPubSubClient:
+    """Test suite for AsyncPubSubClient."""
+
+    @pytest.fixture
+    def client(self):
+        """Create an AsyncPubSubClient instance with mocked Socket.IO."""
+        with patch("src.python_trading_pubsub.core.async_pubsub_client.socketio.AsyncClient") as mock:
+            mock.return_value.emit = AsyncMock()
+            client = AsyncPubSubClient(url="http://localhost:5000/", consumer="test_consumer", topics=["topic1"])
+            return client
+
+    def test_client_initialization(self, client):
+        """Test client initialization with correct parameters."""
+        assert client.url == "http://localhost:5000"
+        assert client.consumer == "test_consumer"
+        assert client.handlers == {}
+        assert client.sio.on.call_count == 4
+        client.sio.on.assert_any_call("message", client.on_message)
+
+    def test_socketio_uses_orjson_codec(self):
+        """Test that Socket.IO packets are encoded with the same orjson codec as the threaded client."""
+        with patch("src.python_trading_pubsub.core.async_pubsub_client.socketio.AsyncClient") as mock:
+            AsyncPubSubClient(url="http://localhost:5000", consumer="test_consumer", topics=["topic1"])
+
+        assert mock.call_args.kwargs["json"] is OrjsonModule
+
+    @pytest.mark.asyncio
+    async def test_process_queue_sync_and_async_handlers(self, client):
+        """Test that coroutine handlers are awaited and plain handlers run off the event loop thread."""
+        received = []
+
+        async def async_handler(message):
+            received.append(("async", message))
+
+        def sync_handler(message):
+            received.append(("sync", message, threading.current_thread() is threading.main_thread()))
+
+        client.register_handler("topic1", async_handler)
+        client.register_handler("topic2", sync_handler)
+        client.message_queue = asyncio.Queue()
+        await client.on_message({"topic": "topic1", "message_id": "msg_1", "message": 1, "producer": "p"})
+        await client.on_message({"topic": "topic2", "message_id": "msg_2", "message": 2, "producer": "p"})
+        await client.message_queue.put(None)
+
+        await asyncio.wait_for(client.process_queue(), timeout=2)
+
+        assert received == [("async", 1), ("sync", 2, False)]
+        client.sio.emit.assert_called_with(
+            "consumed", {"consumer": "test_consumer", "topic": "topic2", "message_id": "msg_2", "message": 2}
+        )
+
+    @pytest.mark.asyncio
+    async def test_concurrent_topics_isolate_slow_handler(self):
+        """Test that a blocked topic does not hold back another topic, while each topic keeps its order."""
+        with patch("src.python_trading_pubsub.core.async_pubsub_client.socketio.AsyncClient") as mock:
+            mock.return_value.emit = AsyncMock()
+            client = AsyncPubSubClient(
+                url="http://localhost:5000", consumer="test_consumer", topics=["slow", "fast"], concurrent_topics=True
+            )
+        release = asyncio.Event()
+        slow_received, fast_received = [], []
+
+        async def slow_handler(message):
+            await release.wait()
+            slow_received.append(message)
+
+        async def fast_handler(message):
+            fast_received.append(message)
+
+        client.register_handler("slow", slow_handler)
+        client.register_handler("fast", fast_handler)
+        client.message_queue = asyncio.Queue()
+        for i in range(3):
+            await client.on_message({"topic": "slow", "message_id": f"s{i}", "message": i, "producer": "p"})
+            await client.on_message({"topic": "fast", "message_id": f"f{i}", "message": i, "producer": "p"})
+        worker = asyncio.ensure_future(client.process_queue())
+
+        await asyncio.sleep(0.05)
+        assert fast_received == [0, 1, 2]
+        assert slow_received == []
+
+        release.set()
+        await client.message_queue.put(None)
+        await asyncio.wait_for(worker, timeout=2)
+        assert slow_received == [0, 1, 2]
+
+    @pytest.mark.asyncio
+    async def test_publish_posts_encoded_message(self, client):
+        """Test that publish POSTs the JSON-encoded message through the httpx client."""
+        response = Mock()
+        response.json.return_value = {"status": "success"}
+        client._http = Mock()
+        client._http.post = AsyncMock(return_value=response)
+
+        await client.publish(topic="topic1", message={"data": "test"}, producer="test_producer", message_id="msg_123")
+
+        call_args = client._http.post.call_args
+        assert call_args[0][0] == "/publish"
+        assert orjson.loads(call_args[1]["content"]) == {
+            "topic": "topic1",
+            "message_id": "msg_123",
+            "message": {"data": "test"},
+            "producer": "test_producer",
+        }
+        response.raise_for_status.assert_called_once()
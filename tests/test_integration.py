@@ -15,7 +15,7 @@ class TestPubSubIntegration:
     @pytest.fixture
     def mock_socketio_server(self):
         """Mock a Socket.IO server for integration testing."""
-        with patch("src.python_trading_pubsub.core.pubsub_client.socketio.Client") as mock_client_class:
+        with patch("src.python_trading_pubsub.core.pubsub_client._SocketIOClient") as mock_client_class:
             mock_client = MagicMock()
             mock_client_class.return_value = mock_client
 
@@ -75,7 +75,7 @@ class TestPubSubIntegration:
 
     def test_multiple_clients_different_topics(self):
         """Test multiple clients subscribed to different topics."""
-        with patch("src.python_trading_pubsub.core.pubsub_client.socketio.Client") as mock_client_class:
+        with patch("src.python_trading_pubsub.core.pubsub_client._SocketIOClient") as mock_client_class:
             mock_clients = []
 
             # noinspection PyUnusedLocal
@@ -160,6 +160,7 @@ class TestPubSubIntegration:
         integration_client._test_callbacks["connect"]()
         assert integration_client.running is True
         assert "connected" in connection_events
+        worker = integration_client._worker
 
         integration_client._test_callbacks["disconnect"]()
         assert integration_client.running is False
@@ -169,6 +170,9 @@ class TestPubSubIntegration:
         integration_client._test_callbacks["connect"]()
         assert integration_client.running is True
         assert connection_events.count("connected") == 2
+        # The processing thread survived the disconnection and serves the new connection
+        assert integration_client._worker is worker and worker.is_alive()
+        integration_client.close()
 
     def test_message_ordering(self, integration_client):
         """Test that messages are processed in order."""
@@ -200,7 +204,7 @@ class TestPubSubIntegration:
 
     def test_publish_and_consume_flow(self, integration_client):
         """Test publishing and consuming in the same client."""
-        with patch("requests.post") as mock_post:
+        with patch.object(integration_client._http, "post") as mock_post:
             mock_response = Mock()
             mock_response.json.return_value = {"status": "success"}
             mock_post.return_value = mock_response
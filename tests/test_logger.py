@@ -0,0 +1,36 @@
+"""Tests for the logging setup."""
+
+import logging
+
+import pytest
+
+from src.python_trading_pubsub.business.tools.logger import setup_logging
+
+
+class TestSetupLogging:
+    """Test suite for setup_logging."""
+
+    @pytest.mark.parametrize(
+        "env_level, expected",
+        [("warning", logging.WARNING), ("10", logging.DEBUG), ("", logging.INFO), ("verbose", logging.INFO)],
+    )
+    def test_log_level_from_environment(self, monkeypatch, env_level, expected):
+        """Test that LOG_LEVEL accepts level names and numbers, and that an unknown name falls back to log_level."""
+        monkeypatch.setenv("LOG_LEVEL", env_level)
+        name = f"test_setup_logging_{env_level or 'unset'}"
+
+        log = setup_logging(logging.INFO, name)
+
+        assert log.level == expected
+        logging.getLogger(name).handlers.clear()
+
+    def test_unknown_level_warns(self, monkeypatch, caplog):
+        """Test that an unknown LOG_LEVEL is reported."""
+        monkeypatch.setenv("LOG_LEVEL", "verbose")
+        name = "test_setup_logging_warns"
+
+        with caplog.at_level(logging.WARNING, logger=name):
+            setup_logging(logging.INFO, name)
+
+        assert "Unknown LOG_LEVEL 'verbose'" in caplog.text
+        logging.getLogger(name).handlers.clear()
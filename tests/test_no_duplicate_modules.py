@@ -0,0 +1,37 @@
+"""Tests that the package modules are loaded once, under the name the package was imported with."""
+
+import os
+import subprocess
+import sys
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Imports the package the way an installed copy is imported, then lists the package modules it loaded
+IMPORT_AS_INSTALLED = """
+import sys
+sys.path.insert(0, "src")
+import python_trading_pubsub.business.positions
+import python_trading_pubsub.core.async_pubsub_client
+print("\\n".join(sorted(name for name in sys.modules if "python_trading_pubsub" in name)))
+"""
+
+
+class TestNoDuplicateModules:
+    """Test suite for intra-package imports."""
+
+    def test_installed_package_does_not_load_src_copies(self):
+        """Test that importing python_trading_pubsub never loads a second copy through src.python_trading_pubsub."""
+        result = subprocess.run(
+            [sys.executable, "-c", IMPORT_AS_INSTALLED], cwd=ROOT_DIR, capture_output=True, text=True, check=True
+        )
+        modules = result.stdout.split()
+
+        assert "python_trading_pubsub.core.events" in modules
+        assert [name for name in modules if not name.startswith("python_trading_pubsub")] == []
+
+    def test_one_event_type_class(self):
+        """Test that business code and core share the same EventType class."""
+        from src.python_trading_pubsub.business import positions
+        from src.python_trading_pubsub.core import events
+
+        assert positions.EventType is events.EventType
@@ -0,0 +1,210 @@
+"""Tests for DatabaseManager class."""
+
+import sqlite3
+from contextlib import closing
+from unittest.mock import Mock, patch
+
+import orjson
+import pytest
+
+from src.python_trading_pubsub.business.positions import DatabaseManager
+from src.python_trading_pubsub.core.events import EventType
+
+
+def make_position(position_id, purchase_price=10.0, timestamp="2024-01-01T10:00:00", pool_name="A"):
+    return {
+        "id": position_id,
+        "purchase_price": purchase_price,
+        "number_of_tokens": 2.0,
+        "expected_sale_price": purchase_price * 1.5,
+        "next_purchase_price": purchase_price * 0.9,
+        "variations": "[]",
+        "timestamp": timestamp,
+        "pair": "BTC/USDT",
+        "pool_name": pool_name,
+    }
+
+
+# noinspection PyShadowingNames
+class TestDatabaseManager:
+    """Test suite for DatabaseManager, against a temporary SQLite database."""
+
+    @pytest.fixture
+    def db_path(self, tmp_path):
+        return str(tmp_path / "positions.db")
+
+    @pytest.fixture
+    def make_db(self, db_path):
+        """Creates DatabaseManagers with a mocked Socket.IO client and publish(); stops them afterwards."""
+        managers = []
+
+        def make():
+            with patch("src.python_trading_pubsub.core.pubsub_client._SocketIOClient"):
+                db = DatabaseManager(db_path, "http://localhost:5000")
+            db.publish = Mock()
+            managers.append(db)
+            return db
+
+        yield make
+        for db in managers:
+            db.stop()
+
+    @pytest.fixture
+    def db(self, make_db):
+        return make_db()
+
+    @staticmethod
+    def published(db, event_type):
+        """Payloads published for event_type, in order; JSON fragments rendered by SQLite are decoded."""
+        return [
+            orjson.loads(orjson.dumps(c[0][1])) if isinstance(c[0][1], orjson.Fragment) else c[0][1]
+            for c in db.publish.call_args_list
+            if c[0][0] == event_type.value
+        ]
+
+    @staticmethod
+    def rows(db_path, sql):
+        with closing(sqlite3.connect(db_path)) as conn:
+            return conn.execute(sql).fetchall()
+
+    def test_add_then_count(self, db):
+        """Test that a query sees the position added by the message before it."""
+        db._handle_add_position_request(make_position("p1"))
+        db._handle_request_count_opened_positions(None)
+
+        assert self.published(db, EventType.POSITION_OPENED) == [make_position("p1")]
+        assert self.published(db, EventType.OPENED_POSITIONS_COUNT_RETRIEVED) == [1]
+
+    def test_add_then_sell(self, db, db_path):
+        """Test that selling a position right after adding it closes it and records both events."""
+        db._handle_add_position_request(make_position("p1"))
+        db._handle_sell_position_request("p1")
+
+        assert self.published(db, EventType.POSITION_SOLD) == ["p1"]
+        assert self.rows(db_path, "SELECT status FROM positions") == [("closed",)]
+        assert self.rows(db_path, "SELECT event_type FROM position_events ORDER BY event_id") == [("BUY",), ("SELL",)]
+
+    def test_sell_unknown_position(self, db, db_path):
+        """Test that selling an unknown id still records the SELL event and publishes POSITION_SOLD."""
+        db._handle_sell_position_request("missing")
+
+        assert self.published(db, EventType.POSITION_SOLD) == ["missing"]
+        assert self.rows(db_path, "SELECT position_id, event_type FROM position_events") == [("missing", "SELL")]
+
+    def test_duplicate_in_batch_falls_back_to_single_inserts(self, db, db_path):
+        """Test that one bad row in a batch does not drop the others."""
+        db.ADD_BATCH_WINDOW_SECONDS = 5  # only the wait below ends the batch
+        with patch.object(db, "_insert_positions", wraps=db._insert_positions) as insert:
+            for position_id in ("p1", "p1", "p2"):
+                db._handle_add_position_request(make_position(position_id))
+            db._wait_for_adds()
+
+            assert [len(c[0][0]) for c in insert.call_args_list] == [3, 1, 1, 1]
+        assert self.rows(db_path, "SELECT id FROM positions ORDER BY id") == [("p1",), ("p2",)]
+        assert [p["id"] for p in self.published(db, EventType.POSITION_OPENED)] == ["p1", "p2"]
+
+    def test_migrates_database_without_timestamp_ms(self, make_db, db_path):
+        """Test that a database from before timestamp_ms gets the column, filled from the ISO timestamps."""
+        with closing(sqlite3.connect(db_path)) as conn:
+            conn.execute(
+                """
+                CREATE TABLE positions (
+                    id TEXT PRIMARY KEY, purchase_price REAL NOT NULL, number_of_tokens REAL NOT NULL,
+                    expected_sale_price REAL NOT NULL, next_purchase_price REAL NOT NULL, variations TEXT NOT NULL,
+                    timestamp TEXT NOT NULL, status TEXT NOT NULL, pair TEXT NOT NULL, pool_name TEXT NOT NULL
+                )
+                """
+            )
+            conn.execute("CREATE INDEX idx_positions_timestamp ON positions (timestamp DESC)")
+            conn.execute(
+                "INSERT INTO positions VALUES ('old', 1.0, 1.0, 2.0, 1.0, '[]', ?, 'open', 'X', 'A')",
+                ("2024-01-01T00:00:00",),
+            )
+            conn.commit()
+
+        db = make_db()
+        db._handle_request_last_purchase_price(None)
+
+        assert self.rows(db_path, "SELECT timestamp_ms FROM positions") == [(1704067200000,)]
+        assert self.published(db, EventType.LAST_PURCHASE_PRICE_RETRIEVED) == [1.0]
+
+    def test_opened_positions_payload(self, db):
+        """Test that opened positions are published column by column, in timestamp order, filtered by pool."""
+        db._handle_add_position_request(make_position("p2", 20.0, "2024-01-02T10:00:00"))
+        db._handle_add_position_request(make_position("p1", 10.0, "2024-01-01T10:00:00"))
+        db._handle_add_position_request(make_position("p3", 30.0, "2024-01-03T10:00:00", pool_name="B"))
+        db._handle_request_opened_positions(["A"])
+
+        (payload,) = self.published(db, EventType.OPENED_POSITIONS_RETRIEVED)
+        assert payload["id"] == ["p1", "p2"]
+        assert payload["purchase_price"] == [10.0, 20.0]
+        assert payload["status"] == ["open", "open"]
+        assert payload["pool_name"] == ["A", "A"]
+
+    def test_all_positions_payload(self, db):
+        """Test that all positions are published as one object per position, closed ones included."""
+        db._handle_add_position_request(make_position("p1", 0.1))
+        db._handle_sell_position_request("p1")
+        db._handle_request_all_positions_data(None)
+
+        (payload,) = self.published(db, EventType.ALL_POSITIONS_RETRIEVED)
+        assert payload == [
+            {
+                "id": "p1",
+                "number_of_tokens": 2.0,
+                "expected_sale_price": 0.1 * 1.5,
+                "next_purchase_price": 0.1 * 0.9,
+                "purchase_price": 0.1,
+                "timestamp": "2024-01-01T10:00:00",
+                "status": "closed",
+                "pool_name": "A",
+                "variations": "[]",
+            }
+        ]
+
+    def test_sell_price_update(self, db):
+        """Test that a percentage change sets the sell price from the purchase price, or reports a missing id."""
+        db._handle_add_position_request(make_position("p1", 10.0))
+        db._handle_request_purchase_price_for_sell_update({"position_id": "p1", "percentage_change": 20})
+        db._handle_request_purchase_price_for_sell_update({"position_id": "missing", "percentage_change": 20})
+        db._handle_update_sell_price_request({"position_id": "p1", "new_sell_price": 15.0})
+        db._handle_request_max_sale_price(None)
+
+        assert self.published(db, EventType.SELL_PRICE_UPDATED) == [
+            {"position_id": "p1", "new_sell_price": 12.0},
+            {"position_id": "p1", "new_sell_price": 15.0},
+        ]
+        assert self.published(db, EventType.POSITION_NOT_FOUND_FOR_SELL_UPDATE) == ["missing"]
+        assert self.published(db, EventType.MAX_SALE_PRICE_RETRIEVED) == [15.0]
+
+    def test_stop_finishes_queued_work(self, db, db_path):
+        """Test that stop() handles the messages already received and writes their positions before closing."""
+        for i in range(5):
+            db.message_queue.put(
+                {
+                    "topic": EventType.ADD_POSITION_REQUEST.value,
+                    "message_id": f"m{i}",
+                    "message": make_position(f"p{i}"),
+                    "producer": "test",
+                }
+            )
+        count_topic = EventType.REQUEST_COUNT_OPENED_POSITIONS.value
+        db.message_queue.put({"topic": count_topic, "message_id": "c", "message": None, "producer": "test"})
+        db._worker.start()
+        db.stop()
+
+        assert self.rows(db_path, "SELECT COUNT(*) FROM positions") == [(5,)]
+        assert len(self.published(db, EventType.POSITION_OPENED)) == 5
+        assert self.published(db, EventType.OPENED_POSITIONS_COUNT_RETRIEVED) == [5]
+
+    def test_close_stops_optimize_timer(self, db):
+        """Test that close() cancels the pending PRAGMA optimize and that a late callback neither runs nor re-arms."""
+        db._schedule_optimize()
+        timer = db._optimize_timer
+        assert timer.is_alive()
+
+        db.close()
+
+        assert not timer.is_alive()
+        db._schedule_optimize()
+        assert db._optimize_timer is timer
@@ -3,12 +3,15 @@
 import queue
 import threading
 import time
-from unittest.mock import MagicMock, Mock, patch
+from unittest.mock import ANY, MagicMock, Mock, patch
 
+import httpx
+import orjson
 import pytest
-import requests
 
 from src.python_trading_pubsub.core.pubsub_client import PubSubClient
+from src.python_trading_pubsub.core.pubsub_message import LazyMessage
+from src.python_trading_pubsub.core.ringbuffer import RingBuffer
 
 
 class TestPubSubClient:
@@ -17,19 +20,19 @@ class TestPubSubClient:
     @pytest.fixture
     def mock_sio(self):
         """Create a mock Socket.IO client."""
-        with patch("src.python_trading_pubsub.core.pubsub_client.socketio.Client") as mock:
+        with patch("src.python_trading_pubsub.core.pubsub_client._SocketIOClient") as mock:
             yield mock.return_value
 
     @pytest.fixture
     def client(self, mock_sio):
         """Create a PubSubClient instance with mocked Socket.IO."""
-        with patch("src.python_trading_pubsub.core.pubsub_client.socketio.Client", return_value=mock_sio):
+        with patch("src.python_trading_pubsub.core.pubsub_client._SocketIOClient", return_value=mock_sio):
             client = PubSubClient(url="http://localhost:5000", consumer="test_consumer", topics=["topic1", "topic2"])
             return client
 
     def test_client_initialization(self):
         """Test client initialization with correct parameters."""
-        with patch("src.python_trading_pubsub.core.pubsub_client.socketio.Client") as mock_sio_class:
+        with patch("src.python_trading_pubsub.core.pubsub_client._SocketIOClient") as mock_sio_class:
             mock_sio = MagicMock()
             mock_sio_class.return_value = mock_sio
 
@@ -39,14 +42,26 @@ class TestPubSubClient:
             assert client.consumer == "alice"
             assert client.topics == ["orders", "trades"]
             assert client.handlers == {}
-            assert isinstance(client.message_queue, queue.Queue)
+            assert isinstance(client.message_queue, RingBuffer)
             assert client.running is False
 
             # Verify Socket.IO client configuration
             mock_sio_class.assert_called_once_with(
-                reconnection=True, reconnection_attempts=0, reconnection_delay=2000, reconnection_delay_max=10000
+                client.on_message,
+                reconnection=True,
+                reconnection_attempts=0,
+                reconnection_delay=2000,
+                reconnection_delay_max=10000,
+                serializer="default",
+                json=ANY,
             )
 
+            # Socket.IO packets are encoded with orjson, compact like the stdlib output it replaces
+            json_module = mock_sio_class.call_args.kwargs["json"]
+            assert json_module.dumps({"a": [1, 2]}, separators=(",", ":")) == '{"a":[1,2]}'
+            assert json_module.loads('{"a":[1,2]}') == {"a": [1, 2]}
+            assert json_module.dumps(2**70) == str(2**70)
+
             # Verify event handlers are registered
             assert mock_sio.on.call_count == 4
             mock_sio.on.assert_any_call("connect", client.on_connect)
@@ -54,6 +69,16 @@ class TestPubSubClient:
             mock_sio.on.assert_any_call("disconnect", client.on_disconnect)
             mock_sio.on.assert_any_call("new_message", client.on_new_message)
 
+    def test_msgpack_serializer(self):
+        """Test that the msgpack serializer switches Socket.IO to MessagePack packets, and unknown ones are refused."""
+        from socketio.msgpack_packet import MsgPackPacket
+
+        client = PubSubClient(url="http://localhost:5000", consumer="alice", topics=["orders"], serializer="msgpack")
+        assert client.sio.packet_class is MsgPackPacket
+
+        with pytest.raises(ValueError):
+            PubSubClient(url="http://localhost:5000", consumer="alice", topics=["orders"], serializer="yaml")
+
     def test_register_handler(self, client):
         """Test registering custom handlers for topics."""
         handler1 = Mock()
@@ -67,7 +92,7 @@ class TestPubSubClient:
 
     def test_on_connect(self, client):
         """Test connection handling."""
-        with patch.object(client.sio, "emit") as mock_emit, patch("threading.Thread") as mock_thread:
+        with patch.object(client.sio, "emit") as mock_emit:
             client.on_connect()
 
             # Verify subscription message is sent
@@ -75,10 +100,10 @@ class TestPubSubClient:
                 "subscribe", {"consumer": "test_consumer", "topics": ["topic1", "topic2"]}
             )
 
-            # Verify processing thread is started
+            # Verify the processing thread, created with the client, is started
             assert client.running is True
-            mock_thread.assert_called_once()
-            mock_thread.return_value.start.assert_called_once()
+            assert client._worker.is_alive()
+        client.close()
 
     def test_on_message_queuing(self, client):
         """Test that messages are properly queued."""
@@ -96,6 +121,148 @@ class TestPubSubClient:
         queued_data = client.message_queue.get_nowait()
         assert queued_data == test_data
 
+    def test_direct_dispatch_bypasses_queue(self, client):
+        """Test that a direct handler runs and is acknowledged before on_message returns, without queuing."""
+        handler = Mock()
+        client.register_handler("topic1", handler, direct=True)
+        client.register_handler("topic2", Mock())
+
+        client.on_message({"topic": "topic1", "message_id": "msg_1", "message": "fast", "producer": "p"})
+
+        handler.assert_called_once_with("fast")
+        client.sio.emit.assert_called_once_with(
+            "consumed", {"consumer": "test_consumer", "topic": "topic1", "message_id": "msg_1", "message": "fast"}
+        )
+        assert client.message_queue.empty()
+
+        client.on_message({"topic": "topic2", "message_id": "msg_2", "message": "queued", "producer": "p"})
+        assert client.message_queue.qsize() == 1
+
+    def test_direct_dispatch_from_several_threads(self, client):
+        """Test that a direct topic's messages, received on different threads, are handled one at a time."""
+        running, overlaps, handled, acked = [], [], [], []
+        client.sio.emit.side_effect = lambda event, payload: acked.append(payload["message_id"])  # payload is reused
+
+        def handler(message):
+            running.append(message)
+            overlaps.append(len(running) > 1)
+            time.sleep(0.05)
+            handled.append(message)
+            running.remove(message)
+
+        client.register_handler("topic1", handler, direct=True)
+        threads = [
+            threading.Thread(
+                target=client.on_message,
+                args=({"topic": "topic1", "message_id": f"msg_{i}", "message": i, "producer": "p"},),
+            )
+            for i in range(2)
+        ]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join(timeout=2)
+
+        assert sorted(handled) == [0, 1]
+        assert overlaps == [False, False]
+        assert sorted(acked) == ["msg_0", "msg_1"]
+
+    def test_wildcard_handler(self, client):
+        """Test that a message whose topic has no exact handler goes to the most specific matching filter."""
+        exact, single, multi = Mock(), Mock(), Mock()
+        client.register_handler("prices/btc", exact)
+        client.register_handler("prices/+", single)
+        client.register_handler("prices/#", multi)
+
+        client._dispatch("prices/btc", 1, "msg_1")
+        client._dispatch("prices/eth", 2, "msg_2")
+        client._dispatch("prices/eth/usd", 3, "msg_3")
+
+        exact.assert_called_once_with(1)
+        single.assert_called_once_with(2)
+        multi.assert_called_once_with(3)
+        with pytest.raises(ValueError):
+            client.register_handler("orders/#", Mock(), direct=True)
+
+    def test_raw_handler_receives_lazy_message(self, client):
+        """Test that a raw handler gets a LazyMessage over the payload text, while the ack echoes the text."""
+        received = []
+        client.register_handler("topic1", received.append, raw=True)
+
+        client._dispatch("topic1", '{"price": 1.5}', "msg_1")
+
+        assert isinstance(received[0], LazyMessage)
+        assert received[0]["price"] == 1.5
+        client.sio.emit.assert_called_once_with(
+            "consumed",
+            {"consumer": "test_consumer", "topic": "topic1", "message_id": "msg_1", "message": '{"price": 1.5}'},
+        )
+
+    def test_queue_full_triggers_nack(self, mock_sio):
+        """Test that with nack_when_full, a message arriving at a full queue is refused instead of blocking."""
+        with patch("src.python_trading_pubsub.core.pubsub_client._SocketIOClient", return_value=mock_sio):
+            client = PubSubClient(
+                url="http://localhost:5000",
+                consumer="test_consumer",
+                topics=["topic1"],
+                queue_maxsize=2,
+                nack_when_full=True,
+            )
+        for i in range(3):
+            client.on_message({"topic": "topic1", "message_id": f"msg_{i}", "message": i, "producer": "p"})
+
+        assert client.message_queue.qsize() == 2
+        mock_sio.emit.assert_called_once_with(
+            "nack", {"consumer": "test_consumer", "topic": "topic1", "message_id": "msg_2"}
+        )
+
+        # Socket.IO delivers each message on its own thread: every message is queued or nacked, exactly once
+        mock_sio.emit.reset_mock()
+        client.message_queue.get_nowait()
+        client.message_queue.get_nowait()
+        ids = [f"t{t}_{i}" for t in range(8) for i in range(200)]
+        queued = []
+        producing = True
+
+        def produce(t):
+            for i in range(200):
+                client.on_message({"topic": "topic1", "message_id": f"t{t}_{i}", "message": i, "producer": "p"})
+
+        def consume():
+            while producing or not client.message_queue.empty():
+                try:
+                    queued.append(client.message_queue.get(timeout=0.001)["message_id"])
+                except queue.Empty:
+                    pass
+
+        consumer = threading.Thread(target=consume)
+        consumer.start()
+        producers = [threading.Thread(target=produce, args=(t,)) for t in range(8)]
+        for t in producers:
+            t.start()
+        for t in producers:
+            t.join(timeout=5)
+        producing = False
+        consumer.join(timeout=5)
+
+        nacked = [c[0][1]["message_id"] for c in mock_sio.emit.call_args_list if c[0][0] == "nack"]
+        assert sorted(queued + nacked) == sorted(ids)
+
+    def test_message_event_fast_path(self):
+        """Test that the real Socket.IO client delivers "message" events to on_message, and others as usual."""
+        client = PubSubClient(url="http://localhost:5000", consumer="test_consumer", topics=["topic1"])
+        test_data = {"topic": "topic1", "message_id": "msg_123", "message": "test", "producer": "producer1"}
+
+        with patch.object(client.sio, "_get_event_handler") as mock_lookup:
+            client.sio._trigger_event("message", "/", test_data)
+            mock_lookup.assert_not_called()
+        assert client.message_queue.get_nowait() == test_data
+
+        with patch.object(client, "on_new_message") as mock_new_message:
+            client.sio.on("new_message", mock_new_message)
+            client.sio._trigger_event("new_message", "/", test_data)
+            mock_new_message.assert_called_once_with(test_data)
+
     def test_process_queue_with_handler(self, client):
         """Test message processing with registered handler."""
         handler = Mock()
@@ -112,15 +279,12 @@ class TestPubSubClient:
         client.message_queue.put(test_message)
 
         with patch.object(client.sio, "emit") as mock_emit:
-            # Run process_queue in a thread
-            thread = threading.Thread(target=client.process_queue)
-            thread.daemon = True
-            thread.start()
+            # Run process_queue on the client's worker thread
+            client._worker.start()
 
             # Give time for processing
             time.sleep(0.1)
-            client.running = False
-            thread.join(timeout=2)
+            client.close()
 
             # Verify handler was called
             handler.assert_called_once_with({"data": "test"})
@@ -131,6 +295,36 @@ class TestPubSubClient:
                 {"consumer": "test_consumer", "topic": "topic1", "message_id": "msg_123", "message": {"data": "test"}},
             )
 
+    def test_consumed_payload_reuse_is_encoded_per_message(self):
+        """Test that reusing the "consumed" payload dict still sends each message's own acknowledgement."""
+        client = PubSubClient(url="http://localhost:5000", consumer="test_consumer", topics=["topic1"])
+        client.sio.namespaces = {"/": "sid"}  # act as connected
+        sent = []
+        with patch.object(client.sio.eio, "send", side_effect=sent.append):
+            client._dispatch("topic1", {"n": 1}, "msg_1")
+            client._dispatch("topic1", {"n": 2}, "msg_2")
+
+        assert [orjson.loads(packet[packet.index("[") :]) for packet in sent] == [
+            ["consumed", {"consumer": "test_consumer", "topic": "topic1", "message_id": "msg_1", "message": {"n": 1}}],
+            ["consumed", {"consumer": "test_consumer", "topic": "topic1", "message_id": "msg_2", "message": {"n": 2}}],
+        ]
+
+    def test_dispatch_is_per_thread(self, client):
+        """Test that each thread builds its dispatch function once, and that the ack mode is not frozen in it."""
+        dispatch = client._thread_dispatch()
+        assert client._thread_dispatch() is dispatch
+        other = []
+        thread = threading.Thread(target=lambda: other.append(client._thread_dispatch()))
+        thread.start()
+        thread.join()
+        assert other[0] is not dispatch
+
+        client.ack_batch_size = 2
+        with patch.object(client, "_queue_ack") as queue_ack:
+            client._dispatch("topic1", "test", "msg_1")
+        queue_ack.assert_called_once_with("topic1", "msg_1")
+        client.sio.emit.assert_not_called()
+
     def test_process_queue_without_handler(self, client):
         """Test message processing when no handler is registered."""
         client.running = True
@@ -141,13 +335,10 @@ class TestPubSubClient:
 
         with patch.object(client.sio, "emit") as mock_emit:
             # Run process_queue briefly
-            thread = threading.Thread(target=client.process_queue)
-            thread.daemon = True
-            thread.start()
+            client._worker.start()
 
             time.sleep(0.1)
-            client.running = False
-            thread.join(timeout=2)
+            client.close()
 
             # Consumption should still be confirmed even without handler
             mock_emit.assert_called_with(
@@ -155,6 +346,17 @@ class TestPubSubClient:
                 {"consumer": "test_consumer", "topic": "unknown_topic", "message_id": "msg_123", "message": "test"},
             )
 
+    def test_handler_registered_while_processing(self, client):
+        """Test that a handler registered after the processing thread started is used for later messages."""
+        client._worker.start()
+        handler = Mock()
+        client.register_handler("topic1", handler)
+        client.message_queue.put({"topic": "topic1", "message_id": "msg_1", "message": "late", "producer": "p"})
+
+        time.sleep(0.1)
+        client.close()
+        handler.assert_called_once_with("late")
+
     def test_process_queue_handler_exception(self, client):
         """Test that handler exceptions are caught and processing continues."""
         handler = Mock(side_effect=Exception("Handler error"))
@@ -166,13 +368,10 @@ class TestPubSubClient:
         client.message_queue.put(test_message)
 
         with patch.object(client.sio, "emit") as mock_emit:
-            thread = threading.Thread(target=client.process_queue)
-            thread.daemon = True
-            thread.start()
+            client._worker.start()
 
             time.sleep(0.1)
-            client.running = False
-            thread.join(timeout=2)
+            client.close()
 
             # Handler should have been called despite exception
             handler.assert_called_once()
@@ -180,16 +379,200 @@ class TestPubSubClient:
             # Consumption should still be confirmed
             mock_emit.assert_called()
 
+    def test_process_queue_batches_acks(self, mock_sio):
+        """Test that acknowledgements are grouped into consumed_batch events when batching is enabled."""
+        with patch("src.python_trading_pubsub.core.pubsub_client._SocketIOClient", return_value=mock_sio):
+            client = PubSubClient(
+                url="http://localhost:5000", consumer="test_consumer", topics=["topic1"], ack_batch_size=2
+            )
+        client.running = True
+
+        for i in range(3):
+            client.message_queue.put({"topic": "topic1", "message_id": f"msg_{i}", "message": i, "producer": "p"})
+
+        client._worker.start()
+
+        time.sleep(0.1)
+        client.close()
+
+        # One full batch, then the remainder once the flush interval elapsed
+        assert mock_sio.emit.call_args_list == [
+            (
+                (
+                    "consumed_batch",
+                    {
+                        "consumer": "test_consumer",
+                        "acks": [
+                            {"topic": "topic1", "message_id": "msg_0"},
+                            {"topic": "topic1", "message_id": "msg_1"},
+                        ],
+                    },
+                ),
+            ),
+            (("consumed_batch", {"consumer": "test_consumer", "acks": [{"topic": "topic1", "message_id": "msg_2"}]}),),
+        ]
+
+    def test_partial_ack_batch_flushed_while_idle(self, mock_sio):
+        """Test that a partial ack batch from a topic worker is sent after ack_flush_ms, with no further message."""
+        with patch("src.python_trading_pubsub.core.pubsub_client._SocketIOClient", return_value=mock_sio):
+            client = PubSubClient(
+                url="http://localhost:5000",
+                consumer="test_consumer",
+                topics=["topic1"],
+                ack_batch_size=64,
+                ack_flush_ms=10,
+                concurrent_topics=True,
+            )
+        client.running = True
+        client.message_queue.put({"topic": "topic1", "message_id": "msg_0", "message": 0, "producer": "p"})
+
+        client._worker.start()
+
+        time.sleep(0.1)
+        mock_sio.emit.assert_called_once_with(
+            "consumed_batch", {"consumer": "test_consumer", "acks": [{"topic": "topic1", "message_id": "msg_0"}]}
+        )
+
+        client.close()
+
+    def test_concurrent_topics_isolate_slow_handler(self, mock_sio):
+        """Test that a blocked topic does not hold back another topic, while each topic keeps its order."""
+        with patch("src.python_trading_pubsub.core.pubsub_client._SocketIOClient", return_value=mock_sio):
+            client = PubSubClient(
+                url="http://localhost:5000", consumer="test_consumer", topics=["slow", "fast"], concurrent_topics=True
+            )
+        release = threading.Event()
+        slow_received, fast_received = [], []
+
+        def slow_handler(message):
+            release.wait(timeout=2)
+            slow_received.append(message)
+
+        client.register_handler("slow", slow_handler)
+        client.register_handler("fast", fast_received.append)
+        client.running = True
+
+        for i in range(3):
+            client.message_queue.put({"topic": "slow", "message_id": f"s{i}", "message": i, "producer": "p"})
+            client.message_queue.put({"topic": "fast", "message_id": f"f{i}", "message": i, "producer": "p"})
+
+        client._worker.start()
+
+        time.sleep(0.1)
+        assert fast_received == [0, 1, 2]
+        assert slow_received == []
+
+        release.set()
+        client.close()
+        assert slow_received == [0, 1, 2]
+
+    def test_close_sends_publishes_from_draining_workers(self, mock_sio):
+        """Test that what topic handlers publish while close() waits for them is still sent."""
+        with patch("src.python_trading_pubsub.core.pubsub_client._SocketIOClient", return_value=mock_sio):
+            client = PubSubClient(
+                url="http://localhost:5000",
+                consumer="test_consumer",
+                topics=["topic1"],
+                concurrent_topics=True,
+                auto_batch=True,
+            )
+
+        def handler(message):
+            time.sleep(0.05)
+            client.publish(topic="results", message=message, producer="test_consumer", message_id=f"r{message}")
+
+        client.register_handler("topic1", handler)
+        for i in range(3):
+            client.message_queue.put({"topic": "topic1", "message_id": f"m{i}", "message": i, "producer": "p"})
+
+        with patch.object(client._http, "post") as mock_post:
+            client._worker.start()
+            client.close()
+
+            sent = [m["message"] for c in mock_post.call_args_list for m in orjson.loads(c[1]["content"])["messages"]]
+            assert sent == [0, 1, 2]
+            assert not client._pub_queue
+
+    def test_max_workers_keeps_order_per_topic(self, mock_sio):
+        """Test that topics share a bounded set of workers, each topic still handled in order on one thread."""
+        with patch("src.python_trading_pubsub.core.pubsub_client._SocketIOClient", return_value=mock_sio):
+            client = PubSubClient(
+                url="http://localhost:5000",
+                consumer="test_consumer",
+                topics=["t0", "t1", "t2", "t3"],
+                concurrent_topics=True,
+                max_workers=2,
+            )
+        received = {f"t{n}": [] for n in range(4)}
+        threads = {f"t{n}": set() for n in range(4)}
+
+        def make_handler(topic):
+            def handler(message):
+                time.sleep(0.001)
+                received[topic].append(message)
+                threads[topic].add(threading.current_thread().name)
+
+            return handler
+
+        for topic in received:
+            client.register_handler(topic, make_handler(topic))
+        client.running = True
+
+        for i in range(20):
+            for topic in received:
+                client.message_queue.put({"topic": topic, "message_id": f"{topic}-{i}", "message": i, "producer": "p"})
+
+        client._worker.start()
+        while not client.message_queue.empty():
+            time.sleep(0.01)
+        client.close()
+
+        assert all(messages == list(range(20)) for messages in received.values())
+        assert all(len(names) == 1 for names in threads.values())
+        assert len(set().union(*threads.values())) == 2
+
     def test_on_disconnect(self, client):
         """Test disconnection handling."""
-        client.running = True
+        client.on_connect()
         client.on_disconnect()
 
         assert client.running is False
+        # The processing thread waits for the reconnection instead of exiting
+        assert client._worker.is_alive()
+        assert client.message_queue.empty()
+        client.close()
+
+    def test_close_stops_worker(self, client):
+        """Test that close() stops an idle processing thread promptly, after disconnecting."""
+        client.on_connect()
+        time.sleep(0.05)
+        client.close()
+
+        client.sio.disconnect.assert_called_once()
+        assert not client._worker.is_alive()
+
+    def test_reconnect_reuses_worker(self, client):
+        """Test that reconnections keep the one processing thread instead of starting new ones."""
+        handled = []
+        client.register_handler("topic1", lambda message: handled.append((message, threading.current_thread())))
+
+        client.on_connect()
+        worker = client._worker
+        threads_before = threading.active_count()
+        for i in range(3):
+            client.on_disconnect()
+            client.on_connect()
+            client.message_queue.put({"topic": "topic1", "message_id": f"m{i}", "message": i, "producer": "p"})
+        time.sleep(0.05)
+
+        assert client._worker is worker and worker.is_alive()
+        assert threading.active_count() == threads_before
+        assert handled == [(0, worker), (1, worker), (2, worker)]
+        client.close()
 
     def test_publish_success(self, client):
         """Test successful message publishing."""
-        with patch("requests.post") as mock_post:
+        with patch.object(client._http, "post") as mock_post:
             mock_response = Mock()
             mock_response.json.return_value = {"status": "success"}
             mock_post.return_value = mock_response
@@ -199,18 +582,119 @@ class TestPubSubClient:
             # Verify POST request
             mock_post.assert_called_once()
             call_args = mock_post.call_args
-            assert call_args[0][0] == "http://localhost:5000/publish"
+            assert call_args[0][0] == "/publish"
 
-            json_data = call_args[1]["json"]
+            json_data = orjson.loads(call_args[1]["content"])
             assert json_data["topic"] == "topic1"
             assert json_data["message"] == {"data": "test"}
             assert json_data["producer"] == "test_producer"
             assert json_data["message_id"] == "msg_123"
 
+    def test_publish_sync_reports_outcome(self, client):
+        """Test that publish_sync tells whether the backend accepted the message."""
+        with patch.object(client._http, "post") as mock_post:
+            assert client.publish_sync(topic="topic1", message="test", producer="test_producer", message_id="m1")
+
+            mock_post.side_effect = httpx.ConnectError("Connection failed")
+            assert not client.publish_sync(topic="topic1", message="test", producer="test_producer", message_id="m2")
+
+    def test_publish_workers_return_future(self, mock_sio):
+        """Test that with publish_workers, publish returns at once and the POST happens on a pool thread."""
+        with patch("src.python_trading_pubsub.core.pubsub_client._SocketIOClient", return_value=mock_sio):
+            client = PubSubClient(
+                url="http://localhost:5000", consumer="test_consumer", topics=["topic1"], publish_workers=2
+            )
+        posting_threads = []
+
+        def post(*args, **kwargs):
+            posting_threads.append(threading.current_thread())
+            return Mock()
+
+        with patch.object(client._http, "post", side_effect=post) as mock_post:
+
+            future = client.publish(topic="topic1", message="test", producer="test_producer", message_id="msg_1")
+
+            assert future.result(timeout=2) is True
+            assert orjson.loads(mock_post.call_args[1]["content"])["message_id"] == "msg_1"
+            assert posting_threads[0] is not threading.current_thread()
+            client.close()
+
+    def test_publish_connections_round_robin(self, mock_sio):
+        """Test that with publish_connections, successive publishes are spread over the HTTP clients in turn."""
+        with patch("src.python_trading_pubsub.core.pubsub_client._SocketIOClient", return_value=mock_sio):
+            client = PubSubClient(
+                url="http://localhost:5000", consumer="test_consumer", topics=["topic1"], publish_connections=2
+            )
+        first, second = client._http_clients
+
+        with patch.object(first, "post") as first_post, patch.object(second, "post") as second_post:
+            for i in range(4):
+                client.publish(topic="topic1", message=i, producer="test_producer", message_id=f"msg_{i}")
+
+            assert [orjson.loads(c[1]["content"])["message"] for c in first_post.call_args_list] == [0, 2]
+            assert [orjson.loads(c[1]["content"])["message"] for c in second_post.call_args_list] == [1, 3]
+        client.close()
+
+    def test_publish_embeds_json_fragment(self, client):
+        """Test that a pre-serialized orjson.Fragment is sent as JSON, not as a string."""
+        with patch.object(client._http, "post") as mock_post:
+            client.publish(
+                topic="topic1", message=orjson.Fragment('[{"id":"p1"}]'), producer="test_producer", message_id="msg_123"
+            )
+
+            json_data = orjson.loads(mock_post.call_args[1]["content"])
+            assert json_data["message"] == [{"id": "p1"}]
+
+    def test_publish_async_sends_one_batch(self, client):
+        """Test that queued messages are sent together, in order, to /publish_batch."""
+        client.PUBLISH_BATCH_INTERVAL_SECONDS = 5  # only close() ends the batch window
+        with patch.object(client._http, "post") as mock_post:
+            for i in range(3):
+                client.publish_async(topic="topic1", message=i, producer="test_producer", message_id=f"msg_{i}")
+            client.publish(topic="topic2", message="last", producer="test_producer", message_id="msg_3", batch=True)
+            client.close()
+
+            mock_post.assert_called_once()
+            assert mock_post.call_args[0][0] == "/publish_batch"
+            messages = orjson.loads(mock_post.call_args[1]["content"])["messages"]
+            assert [m["message_id"] for m in messages] == ["msg_0", "msg_1", "msg_2", "msg_3"]
+            assert messages[3] == {
+                "topic": "topic2",
+                "message_id": "msg_3",
+                "message": "last",
+                "producer": "test_producer",
+            }
+
+    def test_publish_batch_single_post(self, client):
+        """Test that publish_batch sends all its messages, in order, in one POST to /publish_batch."""
+        with patch.object(client._http, "post") as mock_post:
+            sent = client.publish_batch(
+                {"topic": "topic1", "message": i, "producer": "test_producer", "message_id": f"msg_{i}"}
+                for i in range(3)
+            )
+
+            assert sent is True
+            mock_post.assert_called_once()
+            assert mock_post.call_args[0][0] == "/publish_batch"
+            messages = orjson.loads(mock_post.call_args[1]["content"])["messages"]
+            assert [(m["message_id"], m["message"]) for m in messages] == [("msg_0", 0), ("msg_1", 1), ("msg_2", 2)]
+
+    def test_auto_batch(self, client):
+        """Test that with auto_batch, publish queues for /publish_batch unless batch=False is passed."""
+        client.auto_batch = True
+        client.PUBLISH_BATCH_INTERVAL_SECONDS = 5  # only close() ends the batch window
+        with patch.object(client._http, "post") as mock_post:
+            client.publish(topic="topic1", message="queued", producer="test_producer", message_id="msg_1")
+            client.publish(topic="topic1", message="now", producer="test_producer", message_id="msg_2", batch=False)
+
+            assert [c[0][0] for c in mock_post.call_args_list] == ["/publish"]
+            client.close()
+            assert [c[0][0] for c in mock_post.call_args_list] == ["/publish", "/publish_batch"]
+
     def test_publish_connection_error(self, client):
         """Test publishing with connection error."""
-        with patch("requests.post") as mock_post:
-            mock_post.side_effect = requests.exceptions.ConnectionError("Connection failed")
+        with patch.object(client._http, "post") as mock_post:
+            mock_post.side_effect = httpx.ConnectError("Connection failed")
 
             # Should not raise exception
             client.publish(topic="topic1", message="test", producer="test_producer", message_id="msg_123")
@@ -219,12 +703,11 @@ class TestPubSubClient:
 
     def test_publish_http_error(self, client):
         """Test publishing with HTTP error response."""
-        with patch("requests.post") as mock_post:
+        with patch.object(client._http, "post") as mock_post:
             mock_response = Mock()
             mock_response.status_code = 500
             mock_response.text = "Internal Server Error"
-            http_error = requests.exceptions.HTTPError()
-            http_error.response = mock_response
+            http_error = httpx.HTTPStatusError("Server error", request=Mock(), response=mock_response)
             mock_response.raise_for_status.side_effect = http_error
             mock_post.return_value = mock_response
 
@@ -243,7 +726,7 @@ class TestPubSubClient:
 
     def test_url_trailing_slash_removal(self):
         """Test that trailing slash is removed from URL."""
-        with patch("src.python_trading_pubsub.core.pubsub_client.socketio.Client"):
+        with patch("src.python_trading_pubsub.core.pubsub_client._SocketIOClient"):
             client = PubSubClient(url="http://localhost:5000///", consumer="test", topics=[])
             assert client.url == "http://localhost:5000"
 
@@ -1,8 +1,15 @@
 """Tests for PubSubMessage class."""
 
+import copy
+import dataclasses
+import pickle
+from unittest.mock import patch
 from uuid import UUID
 
-from src.python_trading_pubsub.core.pubsub_message import PubSubMessage
+import orjson
+import pytest
+
+from src.python_trading_pubsub.core.pubsub_message import LazyMessage, PubSubMessage
 
 
 class TestPubSubMessage:
@@ -16,7 +23,7 @@ class TestPubSubMessage:
         assert msg.message == {"data": "test"}
         assert msg.producer == "test_producer"
         assert msg.message_id is not None
-        # Verify it's a valid UUID
+        # 128 random bits, as hex: still parses as a UUID
         UUID(msg.message_id)
 
     def test_create_message_with_custom_id(self):
@@ -68,6 +75,23 @@ class TestPubSubMessage:
         assert msg.message == "original_message"
         assert msg.producer == "original_producer"
 
+    def test_message_frozen_and_slotted(self):
+        """Test that fields cannot be reassigned and instances carry no __dict__."""
+        msg = PubSubMessage.new(topic="test", message="payload", producer="producer", message_id="id_1")
+
+        with pytest.raises(dataclasses.FrozenInstanceError):
+            msg.topic = "other"
+        assert not hasattr(msg, "__dict__")
+
+    def test_message_hashable_and_copyable(self):
+        """Test that messages with hashable content work as dict keys and survive copy and pickle."""
+        msg = PubSubMessage(topic="test", message_id="id_1", message="payload", producer="producer")
+        same = PubSubMessage(topic="test", message_id="id_1", message="payload", producer="producer")
+
+        assert {msg: 1}[same] == 1
+        assert copy.copy(msg) == msg
+        assert pickle.loads(pickle.dumps(msg)) == msg
+
     def test_message_equality(self):
         """Test message equality based on all fields."""
         msg1 = PubSubMessage(topic="test", message_id="same_id", message="same_message", producer="same_producer")
@@ -88,3 +112,33 @@ class TestPubSubMessage:
         assert "test_topic" in repr_str
         assert "test_123" in repr_str
         assert "test_producer" in repr_str
+
+    def test_message_encoded(self):
+        """Test that the JSON encoding matches to_dict and is computed once."""
+        msg = PubSubMessage.new(topic="test_topic", message={"price": 1.5}, producer="test_producer", message_id="id_1")
+
+        assert orjson.loads(msg.encoded) == msg.to_dict()
+        assert msg.encoded is msg.encoded
+
+
+class TestLazyMessage:
+    """Test suite for LazyMessage."""
+
+    def test_parses_once_on_first_access(self):
+        """Test that JSON text is only parsed when read, and only once."""
+        with patch("src.python_trading_pubsub.core.pubsub_message.orjson.loads", wraps=orjson.loads) as loads:
+            msg = LazyMessage('{"symbol": "BTC", "bids": [[1, 2]]}')
+            loads.assert_not_called()
+
+            assert msg["symbol"] == "BTC"
+            assert msg.get("asks") is None
+            assert msg.value == {"symbol": "BTC", "bids": [[1, 2]]}
+            loads.assert_called_once()
+
+    def test_decoded_payload_used_as_is(self):
+        """Test that a payload which did not arrive as text is not parsed again."""
+        payload = {"symbol": "BTC"}
+        msg = LazyMessage(payload)
+
+        assert msg.value is payload
+        assert msg.raw is payload
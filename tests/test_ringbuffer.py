@@ -0,0 +1,112 @@
+"""Tests for RingBuffer class."""
+
+import queue
+import threading
+import time
+
+import pytest
+
+from src.python_trading_pubsub.core.ringbuffer import RingBuffer
+
+
+class TestRingBuffer:
+    """Test suite for RingBuffer."""
+
+    def test_capacity_must_be_power_of_two(self):
+        """Test that a capacity which is not a power of two is rejected."""
+        with pytest.raises(ValueError):
+            RingBuffer(1000)
+        assert RingBuffer(1024).capacity == 1024
+
+    def test_fifo_order_and_size(self):
+        """Test that items come out in insertion order, across the wrap-around."""
+        ring = RingBuffer(4)
+        assert ring.empty()
+
+        for round_start in (0, 3, 6):
+            for i in range(round_start, round_start + 3):
+                ring.put(i)
+            assert ring.qsize() == 3
+            assert [ring.get_nowait() for _ in range(3)] == list(range(round_start, round_start + 3))
+            assert ring.empty()
+
+    def test_get_on_empty_raises_queue_empty(self):
+        """Test that non-blocking and timed-out reads raise queue.Empty."""
+        ring = RingBuffer(2)
+        with pytest.raises(queue.Empty):
+            ring.get_nowait()
+        with pytest.raises(queue.Empty):
+            ring.get(timeout=0.01)
+
+    def test_put_on_full_raises_queue_full(self):
+        """Test that a full buffer applies back-pressure."""
+        ring = RingBuffer(2)
+        ring.put("a")
+        ring.put("b")
+        assert ring.full()
+        with pytest.raises(queue.Full):
+            ring.put_nowait("c")
+        with pytest.raises(queue.Full):
+            ring.put("c", timeout=0.01)
+
+    def test_producer_consumer_threads(self):
+        """Test one producer and one consumer thread exchanging more items than the capacity."""
+        ring = RingBuffer(8)
+        received = []
+
+        def consume():
+            for _ in range(1000):
+                received.append(ring.get(timeout=2))
+
+        consumer = threading.Thread(target=consume)
+        consumer.start()
+        for i in range(1000):
+            ring.put(i, timeout=2)
+        consumer.join(timeout=5)
+
+        assert received == list(range(1000))
+
+    def test_multiple_producer_threads(self):
+        """Test that items put concurrently by several producer threads each arrive exactly once."""
+        ring = RingBuffer(8)
+        producers, per_producer = 8, 500
+        received = []
+
+        def consume():
+            for _ in range(producers * per_producer):
+                received.append(ring.get(timeout=2))
+
+        def produce(p):
+            for i in range(per_producer):
+                ring.put((p, i), timeout=2)
+
+        consumer = threading.Thread(target=consume)
+        consumer.start()
+        threads = [threading.Thread(target=produce, args=(p,)) for p in range(producers)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join(timeout=5)
+        consumer.join(timeout=5)
+
+        assert sorted(received) == [(p, i) for p in range(producers) for i in range(per_producer)]
+        for p in range(producers):
+            assert [i for q, i in received if q == p] == list(range(per_producer))
+
+    def test_blocked_producers_on_full_buffer(self):
+        """Test that producers blocked on a full buffer each take a distinct slot once the consumer frees them."""
+        ring = RingBuffer(2)
+        ring.put("a")
+        ring.put("b")
+        threads = [threading.Thread(target=ring.put, args=(f"p{i}",), kwargs={"timeout": 2}) for i in range(4)]
+        for t in threads:
+            t.start()
+        time.sleep(0.05)  # let every producer block
+
+        received = [ring.get(timeout=2) for _ in range(6)]
+        for t in threads:
+            t.join(timeout=2)
+
+        assert received[:2] == ["a", "b"]
+        assert sorted(received[2:]) == ["p0", "p1", "p2", "p3"]
+        assert ring.empty()
@@ -0,0 +1,52 @@
+"""Tests for TopicMatcher class."""
+
+import pytest
+
+from src.python_trading_pubsub.core.topic_matcher import TopicMatcher
+
+
+class TestTopicMatcher:
+    """Test suite for TopicMatcher."""
+
+    def test_is_filter(self):
+        """Test that only topics containing a wildcard are filters."""
+        assert TopicMatcher.is_filter("prices/+")
+        assert TopicMatcher.is_filter("orders/#")
+        assert not TopicMatcher.is_filter("prices/btc")
+
+    def test_single_level_wildcard(self):
+        """Test that '+' matches exactly one topic level."""
+        matcher = TopicMatcher()
+        matcher.add("prices/+/usd", "handler")
+
+        assert matcher.match("prices/btc/usd") == "handler"
+        assert matcher.match("prices/btc") is None
+        assert matcher.match("prices/btc/usd/spot") is None
+
+    def test_multi_level_wildcard(self):
+        """Test that '#' matches any number of trailing levels, including none."""
+        matcher = TopicMatcher()
+        matcher.add("orders/#", "handler")
+
+        assert matcher.match("orders") == "handler"
+        assert matcher.match("orders/new") == "handler"
+        assert matcher.match("orders/new/btc") == "handler"
+        assert matcher.match("trades/new") is None
+
+    def test_most_specific_filter_wins(self):
+        """Test that a literal level beats '+', which beats '#', even when it means backtracking."""
+        matcher = TopicMatcher()
+        matcher.add("prices/#", "multi")
+        matcher.add("prices/+/usd", "single")
+        matcher.add("prices/btc/+", "literal")
+
+        assert matcher.match("prices/btc/usd") == "literal"
+        assert matcher.match("prices/eth/usd") == "single"
+        assert matcher.match("prices/eth/eur") == "multi"
+
+    def test_invalid_filters(self):
+        """Test that wildcards not taking a whole level, or '#' before the last level, are rejected."""
+        matcher = TopicMatcher()
+        for topic_filter in ("prices/b+", "prices/#btc", "prices/#/usd"):
+            with pytest.raises(ValueError):
+                matcher.add(topic_filter, "handler")